@@ -7,15 +7,16 @@ switching based on user needs and task requirements.
 """
 
 import asyncio
+import copy
+import heapq
 import json
 import time
-import uuid
 import logging
-import hashlib
+import itertools
 from typing import Dict, List, Any, Optional, Union, Tuple, Set
 from dataclasses import dataclass, asdict
 from enum import Enum
-from collections import defaultdict, deque
+from collections import defaultdict, deque, Counter
 from datetime import datetime, timedelta
 
 
@@ -51,7 +52,12 @@ class ContextPriority(Enum):
 
 @dataclass
 class ContextItem:
-    """Individual context item"""
+    """
+    Individual context item
+    
+    Content is tokenized once for searches; replace it (item.content = {...})
+    rather than mutating it in place so the tokens are recomputed.
+    """
     context_id: str
     context_type: ContextType
     scope: ContextScope
@@ -67,6 +73,13 @@ class ContextItem:
     dependencies: List[str]  # IDs of dependent contexts
     parent_context: Optional[str]
     child_contexts: List[str]
+    
+    def __setattr__(self, name: str, value: Any):
+        # Drop the cached content tokens (see ContextManager._get_content_tokens)
+        # whenever the content is replaced
+        if name == 'content':
+            self.__dict__.pop('_content_tokens', None)
+        object.__setattr__(self, name, value)
 
 
 @dataclass
@@ -95,6 +108,8 @@ class ContextQuery:
     include_expired: bool = False
     limit: int = 10
     relevance_threshold: float = 0.5
+    user_id: Optional[str] = None
+    session_id: Optional[str] = None
 
 
 @dataclass
@@ -134,9 +149,11 @@ class ContextManager:
         self.context_expiry_hours = self.config.get('context_expiry_hours', 24)
         self.enable_context_compression = self.config.get('enable_context_compression', True)
         self.enable_semantic_clustering = self.config.get('enable_semantic_clustering', True)
+        self.max_switch_history = self.config.get('max_switch_history', 1000)  # Per user/session
         
         # Context storage
         self.contexts = {}  # All contexts by ID
+        self._id_counter = itertools.count(int(time.time() * 1000000))
         self.context_windows = {}  # Active context windows by user/session
         self.context_index = {}  # Fast lookup indices
         self.tag_index = defaultdict(set)
@@ -149,8 +166,16 @@ class ContextManager:
         self.semantic_clusters = defaultdict(set)  # Semantic context clusters
         
         # Context switching
-        self.switch_history = defaultdict(list)
+        self.switch_history = defaultdict(lambda: deque(maxlen=self.max_switch_history))
         self.context_transitions = defaultdict(lambda: defaultdict(int))
+        self.context_transition_totals = Counter()  # Running transition count by source context
+        
+        # Context merge strategies
+        self.merge_strategies = {
+            "union": self._merge_union,
+            "intersection": self._merge_intersection,
+            "weighted": self._merge_weighted
+        }
         
         # Performance tracking
         self.context_stats = {
@@ -161,6 +186,7 @@ class ContextManager:
             'context_hit_rate': 0.0,
             'compression_ratio': 0.0
         }
+        self.context_type_counts = Counter()  # Running context count by type value
         
         # Initialize context management
         self._initialize_default_contexts()
@@ -198,14 +224,15 @@ class ContextManager:
         """
         try:
             # Generate context ID
-            context_id = self._generate_context_id(content, context_type)
+            context_id = self._generate_context_id()
+            current_time = time.time()
             
             # Calculate expiration time
             expires_at = None
             if expires_in_hours:
-                expires_at = time.time() + (expires_in_hours * 3600)
+                expires_at = current_time + (expires_in_hours * 3600)
             elif self.context_expiry_hours > 0:
-                expires_at = time.time() + (self.context_expiry_hours * 3600)
+                expires_at = current_time + (self.context_expiry_hours * 3600)
             
             # Create context item
             context_item = ContextItem(
@@ -213,14 +240,16 @@ class ContextManager:
                 context_type=context_type,
                 scope=scope,
                 priority=priority,
-                content=content,
+                # Copied so later changes to the caller's dict can't leave the
+                # cached content tokens stale
+                content=copy.deepcopy(content),
                 metadata={
                     'user_id': user_id,
                     'session_id': session_id,
                     'created_by': 'context_manager'
                 },
-                created_at=time.time(),
-                last_accessed=time.time(),
+                created_at=current_time,
+                last_accessed=current_time,
                 expires_at=expires_at,
                 access_count=1,
                 relevance_score=self._calculate_initial_relevance(content, context_type, priority),
@@ -234,7 +263,7 @@ class ContextManager:
             await self._store_context(context_item)
             
             # Update indices
-            await self._update_context_indices(context_item)
+            self._update_context_indices(context_item)
             
             # Handle parent-child relationships
             if parent_context and parent_context in self.contexts:
@@ -249,7 +278,7 @@ class ContextManager:
             self.context_stats['total_contexts'] += 1
             self.context_stats['active_contexts'] += 1
             
-            self.logger.info(f"Context created: {context_id} ({context_type.value})")
+            self.logger.info("Context created: %s (%s)", context_id, context_type.value)
             return context_id
             
         except Exception as e:
@@ -282,7 +311,7 @@ class ContextManager:
             context.access_count += 1
             
             # Update relevance score based on access pattern
-            await self._update_context_relevance(context)
+            self._update_context_relevance(context)
             
             return context
             
@@ -302,29 +331,33 @@ class ContextManager:
         """
         try:
             # Get candidate contexts
-            candidates = await self._get_candidate_contexts(query)
+            candidates = self._get_candidate_contexts(query)
+            current_time = time.time()
+            
+            # Tokenize the query text once rather than once per candidate context
+            query_words = self._get_query_words(query.query_text) if query.query_text else None
             
             # Filter and score contexts
             scored_contexts = []
             for context in candidates:
                 # Check expiration
-                if context.expires_at and time.time() > context.expires_at:
+                if context.expires_at and current_time > context.expires_at:
                     if not query.include_expired:
                         continue
                 
                 # Calculate relevance score
-                relevance = await self._calculate_context_relevance(context, query)
+                relevance = self._calculate_context_relevance(context, query, current_time, query_words)
                 
                 if relevance >= query.relevance_threshold:
                     scored_contexts.append((context, relevance))
             
-            # Sort by relevance and limit results
-            scored_contexts.sort(key=lambda x: x[1], reverse=True)
-            results = [context for context, score in scored_contexts[:query.limit]]
+            # Select the most relevant contexts up to the limit
+            top_contexts = heapq.nlargest(query.limit, scored_contexts, key=lambda x: x[1])
+            results = [context for context, score in top_contexts]
             
             # Update access counts
             for context in results:
-                context.last_accessed = time.time()
+                context.last_accessed = current_time
                 context.access_count += 1
             
             return results
@@ -354,7 +387,7 @@ class ContextManager:
             if window_key not in self.context_windows:
                 # Create new context window
                 window = ContextWindow(
-                    window_id=f"window_{uuid.uuid4().hex[:8]}",
+                    window_id=f"window_{next(self._id_counter):016x}",
                     user_id=user_id,
                     session_id=session_id,
                     active_contexts=[],
@@ -427,7 +460,7 @@ class ContextManager:
             
             # Record context switch event
             switch_event = ContextSwitchEvent(
-                event_id=f"switch_{uuid.uuid4().hex[:8]}",
+                event_id=f"switch_{next(self._id_counter):016x}",
                 user_id=user_id,
                 session_id=session_id,
                 from_context=current_context,
@@ -442,11 +475,12 @@ class ContextManager:
             # Update transition statistics
             if current_context:
                 self.context_transitions[current_context][target_context_id] += 1
+                self.context_transition_totals[current_context] += 1
             
             # Update statistics
             self.context_stats['context_switches'] += 1
             
-            self.logger.info(f"Context switched from {current_context} to {target_context_id}")
+            self.logger.info("Context switched from %s to %s", current_context, target_context_id)
             return True
             
         except Exception as e:
@@ -490,19 +524,21 @@ class ContextManager:
             # Remove already active contexts
             candidate_context_ids -= set(window.active_contexts)
             
+            # Tokenize the task once rather than once per candidate context
+            task_keywords = self._get_task_keywords(current_task) if current_task else None
+            
             # Score contexts for relevance
             scored_contexts = []
             for context_id in candidate_context_ids:
                 context = await self.get_context(context_id)
                 if context:
-                    relevance = await self._calculate_recommendation_relevance(
-                        context, window, current_task
+                    relevance = self._calculate_recommendation_relevance(
+                        context, window, current_task, task_keywords
                     )
                     scored_contexts.append((context_id, relevance))
             
-            # Sort by relevance and return top recommendations
-            scored_contexts.sort(key=lambda x: x[1], reverse=True)
-            recommendations = scored_contexts[:max_recommendations]
+            # Return top recommendations by relevance
+            recommendations = heapq.nlargest(max_recommendations, scored_contexts, key=lambda x: x[1])
             
             return recommendations
             
@@ -605,7 +641,7 @@ class ContextManager:
             for context_id in window.active_contexts:
                 context = await self.get_context(context_id)
                 if context:
-                    score = await self._calculate_compression_score(context, window)
+                    score = self._calculate_compression_score(context, window)
                     context_scores.append((context_id, score))
             
             # Sort by score (higher is more important to keep)
@@ -711,11 +747,11 @@ class ContextManager:
             optimization_results['optimization_time'] = time.time() - start_time
             return optimization_results
     
-    def _generate_context_id(self, content: Dict[str, Any], context_type: ContextType) -> str:
+    def _generate_context_id(self) -> str:
         """Generate unique context ID"""
-        content_str = json.dumps(content, sort_keys=True)
-        hash_input = f"{content_str}_{context_type.value}_{time.time()}"
-        return hashlib.sha256(hash_input.encode()).hexdigest()[:16]
+        # 16 hex digits from a counter seeded with the start time in microseconds:
+        # unique within the process and ordered by creation across restarts
+        return f"{next(self._id_counter):016x}"
     
     def _calculate_initial_relevance(
         self, 
@@ -761,9 +797,12 @@ class ContextManager:
     
     async def _store_context(self, context_item: ContextItem):
         """Store context in memory"""
+        if context_item.context_id not in self.contexts:
+            self.context_type_counts[context_item.context_type.value] += 1
+        
         self.contexts[context_item.context_id] = context_item
     
-    async def _update_context_indices(self, context_item: ContextItem):
+    def _update_context_indices(self, context_item: ContextItem):
         """Update context indices"""
         context_id = context_item.context_id
         
@@ -826,7 +865,7 @@ class ContextManager:
             # Remove from active tracking
             self.context_stats['active_contexts'] -= 1
     
-    async def _update_context_relevance(self, context: ContextItem):
+    def _update_context_relevance(self, context: ContextItem):
         """Update context relevance based on access patterns"""
         # Simple relevance update based on access frequency and recency
         access_boost = min(0.1, context.access_count * 0.01)
@@ -834,17 +873,33 @@ class ContextManager:
         
         context.relevance_score = min(1.0, context.relevance_score + access_boost * time_decay)
     
-    async def _get_candidate_contexts(self, query: ContextQuery) -> List[ContextItem]:
+    def _get_candidate_contexts(self, query: ContextQuery) -> List[ContextItem]:
         """Get candidate contexts for search query"""
-        candidates = set()
+        candidates = None
+        
+        # Scan only the user's and session's contexts when scoped
+        if query.user_id:
+            candidates = set(self.user_contexts.get(query.user_id, set()))
+        
+        if query.session_id:
+            session_context_ids = self.session_contexts.get(query.session_id, set())
+            if candidates is None:
+                candidates = set(session_context_ids)
+            else:
+                candidates.intersection_update(session_context_ids)
         
         # Filter by context types
         if query.context_types:
+            type_candidates = set()
             for context_type in query.context_types:
                 if context_type in self.type_index:
-                    candidates.update(self.type_index[context_type])
-        else:
-            candidates.update(self.contexts.keys())
+                    type_candidates.update(self.type_index[context_type])
+            if candidates is None:
+                candidates = type_candidates
+            else:
+                candidates.intersection_update(type_candidates)
+        elif candidates is None:
+            candidates = set(self.contexts.keys())
         
         # Filter by tags
         if query.tags:
@@ -862,8 +917,17 @@ class ContextManager:
         
         return candidate_contexts
     
-    async def _calculate_context_relevance(self, context: ContextItem, query: ContextQuery) -> float:
+    def _calculate_context_relevance(
+        self, 
+        context: ContextItem, 
+        query: ContextQuery, 
+        current_time: Optional[float] = None,
+        query_words: Optional[frozenset] = None
+    ) -> float:
         """Calculate context relevance for search query"""
+        if current_time is None:
+            current_time = time.time()
+        
         relevance = 0.0
         
         # Base relevance score
@@ -880,7 +944,7 @@ class ContextManager:
         relevance += priority_scores.get(context.priority, 0.5) * 0.2
         
         # Recency-based relevance
-        age_hours = (time.time() - context.created_at) / 3600
+        age_hours = (current_time - context.created_at) / 3600
         recency_score = max(0.0, 1.0 - (age_hours / 24))  # Decay over 24 hours
         relevance += recency_score * 0.2
         
@@ -890,19 +954,36 @@ class ContextManager:
         
         # Text similarity (if query text provided)
         if query.query_text:
-            text_similarity = await self._calculate_text_similarity(context, query.query_text)
+            text_similarity = self._calculate_text_similarity(context, query.query_text, query_words)
             relevance += text_similarity * 0.2
         
         return min(1.0, relevance)
     
-    async def _calculate_text_similarity(self, context: ContextItem, query_text: str) -> float:
+    def _get_content_tokens(self, context: ContextItem) -> Tuple[str, frozenset]:
+        """Get a context's lowercased content text and word set, tokenized once per content"""
+        tokens = getattr(context, '_content_tokens', None)
+        if tokens is None:
+            context_text = json.dumps(context.content).lower()
+            tokens = (context_text, frozenset(context_text.split()))
+            context._content_tokens = tokens
+        return tokens
+    
+    def _get_query_words(self, query_text: str) -> frozenset:
+        """Get the word set used to match query text against contexts"""
+        return frozenset(query_text.lower().split())
+    
+    def _calculate_text_similarity(
+        self, 
+        context: ContextItem, 
+        query_text: str, 
+        query_words: Optional[frozenset] = None
+    ) -> float:
         """Calculate text similarity between context and query"""
-        context_text = json.dumps(context.content).lower()
-        query_text = query_text.lower()
+        _, context_words = self._get_content_tokens(context)
         
         # Simple keyword matching
-        query_words = set(query_text.split())
-        context_words = set(context_text.split())
+        if query_words is None:
+            query_words = self._get_query_words(query_text)
         
         if not query_words:
             return 0.0
@@ -932,11 +1013,12 @@ class ContextManager:
         
         window.background_contexts = background_contexts
     
-    async def _calculate_recommendation_relevance(
+    def _calculate_recommendation_relevance(
         self,
         context: ContextItem,
         window: ContextWindow,
-        current_task: Optional[Dict[str, Any]]
+        current_task: Optional[Dict[str, Any]],
+        task_keywords: Optional[frozenset] = None
     ) -> float:
         """Calculate relevance for context recommendation"""
         relevance = 0.0
@@ -946,7 +1028,7 @@ class ContextManager:
         
         # Task relevance
         if current_task:
-            task_similarity = await self._calculate_task_similarity(context, current_task)
+            task_similarity = self._calculate_task_similarity(context, current_task, task_keywords)
             relevance += task_similarity * 0.4
         
         # Historical transition probability
@@ -961,14 +1043,23 @@ class ContextManager:
         
         return min(1.0, relevance)
     
-    async def _calculate_task_similarity(self, context: ContextItem, task: Dict[str, Any]) -> float:
+    def _get_task_keywords(self, task: Dict[str, Any]) -> frozenset:
+        """Get the keyword set used to match a task against contexts"""
+        return frozenset(str(task).lower().split())
+    
+    def _calculate_task_similarity(
+        self, 
+        context: ContextItem, 
+        task: Dict[str, Any], 
+        task_keywords: Optional[frozenset] = None
+    ) -> float:
         """Calculate similarity between context and current task"""
         # Simple similarity based on task type and keywords
         task_type = task.get('type', '')
-        task_keywords = set(str(task).lower().split())
+        if task_keywords is None:
+            task_keywords = self._get_task_keywords(task)
         
-        context_text = json.dumps(context.content).lower()
-        context_keywords = set(context_text.split())
+        context_text, context_keywords = self._get_content_tokens(context)
         
         # Keyword overlap
         if task_keywords:
@@ -986,16 +1077,12 @@ class ContextManager:
     
     def _get_transition_probability(self, from_context: str, to_context: str) -> float:
         """Get probability of transitioning from one context to another"""
-        if from_context not in self.context_transitions:
-            return 0.0
-        
-        transitions = self.context_transitions[from_context]
-        total_transitions = sum(transitions.values())
+        total_transitions = self.context_transition_totals[from_context]
         
         if total_transitions == 0:
             return 0.0
         
-        return transitions.get(to_context, 0) / total_transitions
+        return self.context_transitions[from_context].get(to_context, 0) / total_transitions
     
     async def _merge_context_content(
         self,
@@ -1003,51 +1090,49 @@ class ContextManager:
         strategy: str
     ) -> Dict[str, Any]:
         """Merge content from multiple contexts"""
-        if strategy == "union":
-            merged_content = {}
-            for context in contexts:
-                merged_content.update(context.content)
-            return merged_content
-        
-        elif strategy == "intersection":
-            if not contexts:
-                return {}
-            
-            merged_content = contexts[0].content.copy()
-            for context in contexts[1:]:
-                # Keep only common keys
-                common_keys = set(merged_content.keys()).intersection(set(context.content.keys()))
-                merged_content = {k: merged_content[k] for k in common_keys}
-            
-            return merged_content
-        
-        elif strategy == "weighted":
-            merged_content = {}
-            total_weight = sum(context.relevance_score for context in contexts)
-            
-            for context in contexts:
-                weight = context.relevance_score / total_weight if total_weight > 0 else 1.0 / len(contexts)
-                
-                for key, value in context.content.items():
-                    if key not in merged_content:
-                        merged_content[key] = value
-                    # For weighted merge, could implement value averaging for numeric values
-            
-            return merged_content
+        # Unknown strategies default to union
+        merge = self.merge_strategies.get(strategy, self._merge_union)
+        return merge(contexts)
+    
+    def _merge_union(self, contexts: List[ContextItem]) -> Dict[str, Any]:
+        """Merge content keeping every key, later contexts overriding earlier ones"""
+        merged_content = {}
+        for context in contexts:
+            merged_content.update(context.content)
+        return merged_content
+    
+    def _merge_intersection(self, contexts: List[ContextItem]) -> Dict[str, Any]:
+        """Merge content keeping only the keys common to all contexts"""
+        if not contexts:
+            return {}
         
-        else:
-            # Default to union
-            return await self._merge_context_content(contexts, "union")
+        merged_content = contexts[0].content.copy()
+        for context in contexts[1:]:
+            # Keep only common keys
+            common_keys = set(merged_content.keys()).intersection(set(context.content.keys()))
+            merged_content = {k: merged_content[k] for k in common_keys}
+        
+        return merged_content
+    
+    def _merge_weighted(self, contexts: List[ContextItem]) -> Dict[str, Any]:
+        """Merge content keeping the first value seen for each key"""
+        merged_content = {}
+        
+        for context in contexts:
+            for key, value in context.content.items():
+                if key not in merged_content:
+                    merged_content[key] = value
+                # For weighted merge, could implement value averaging for numeric values
+        
+        return merged_content
     
     def _determine_merged_type(self, contexts: List[ContextItem]) -> ContextType:
         """Determine type for merged context"""
         # Use the most common type, or SEMANTIC as default
-        type_counts = defaultdict(int)
-        for context in contexts:
-            type_counts[context.context_type] += 1
+        type_counts = Counter(context.context_type for context in contexts)
         
         if type_counts:
-            return max(type_counts.items(), key=lambda x: x[1])[0]
+            return type_counts.most_common(1)[0][0]
         else:
             return ContextType.SEMANTIC
     
@@ -1072,13 +1157,10 @@ class ContextManager:
         return min_priority.priority
     
     def _merge_tags(self, contexts: List[ContextItem]) -> List[str]:
-        """Merge tags from multiple contexts"""
-        all_tags = set()
-        for context in contexts:
-            all_tags.update(context.tags)
-        return list(all_tags)
+        """Merge tags from multiple contexts, keeping first-seen order"""
+        return list(dict.fromkeys(tag for context in contexts for tag in context.tags))
     
-    async def _calculate_compression_score(self, context: ContextItem, window: ContextWindow) -> float:
+    def _calculate_compression_score(self, context: ContextItem, window: ContextWindow) -> float:
         """Calculate score for context compression (higher = more important to keep)"""
         score = 0.0
         
@@ -1107,12 +1189,7 @@ class ContextManager:
     
     async def _get_context_distribution(self) -> Dict[str, int]:
         """Get distribution of contexts by type"""
-        distribution = defaultdict(int)
-        
-        for context in self.contexts.values():
-            distribution[context.context_type.value] += 1
-        
-        return dict(distribution)
+        return dict(self.context_type_counts)
     
     async def _get_popular_contexts(self, limit: int = 10) -> List[Tuple[str, int]]:
         """Get most popular contexts by access count"""
@@ -1121,8 +1198,7 @@ class ContextManager:
             for context in self.contexts.values()
         ]
         
-        context_popularity.sort(key=lambda x: x[1], reverse=True)
-        return context_popularity[:limit]
+        return heapq.nlargest(limit, context_popularity, key=lambda x: x[1])
     
     async def _analyze_context_patterns(
         self,
@@ -1136,7 +1212,7 @@ class ContextManager:
         if user_id and session_id:
             switch_key = f"{user_id}:{session_id}"
             if switch_key in self.switch_history:
-                switches = self.switch_history[switch_key]
+                switches = list(self.switch_history[switch_key])
                 patterns['switch_frequency'] = len(switches)
                 patterns['average_context_duration'] = self._calculate_average_context_duration(switches)
                 patterns['most_common_switches'] = self._get_common_switch_patterns(switches)
@@ -1157,16 +1233,13 @@ class ContextManager:
     
     def _get_common_switch_patterns(self, switches: List[ContextSwitchEvent]) -> List[Tuple[str, str, int]]:
         """Get common context switch patterns"""
-        patterns = defaultdict(int)
-        
-        for i in range(len(switches) - 1):
-            from_ctx = switches[i].to_context
-            to_ctx = switches[i + 1].to_context
-            patterns[(from_ctx, to_ctx)] += 1
+        # Count consecutive (from, to) pairs of switch targets
+        targets = [switch.to_context for switch in switches]
+        patterns = Counter(zip(targets, targets[1:]))
         
         # Return top 5 patterns
-        sorted_patterns = sorted(patterns.items(), key=lambda x: x[1], reverse=True)
-        return [(from_ctx, to_ctx, count) for (from_ctx, to_ctx), count in sorted_patterns[:5]]
+        top_patterns = patterns.most_common(5)
+        return [(from_ctx, to_ctx, count) for (from_ctx, to_ctx), count in top_patterns]
     
     async def _get_user_context_profile(self, user_id: str) -> Dict[str, Any]:
         """Get context profile for specific user"""
@@ -1178,14 +1251,9 @@ class ContextManager:
         user_contexts = [self.contexts[ctx_id] for ctx_id in user_context_ids if ctx_id in self.contexts]
         
         # Analyze user's context preferences
-        type_distribution = defaultdict(int)
-        priority_distribution = defaultdict(int)
-        total_access = 0
-        
-        for context in user_contexts:
-            type_distribution[context.context_type.value] += 1
-            priority_distribution[context.priority.value] += 1
-            total_access += context.access_count
+        type_distribution = Counter(context.context_type.value for context in user_contexts)
+        priority_distribution = Counter(context.priority.value for context in user_contexts)
+        total_access = sum(context.access_count for context in user_contexts)
         
         return {
             'total_contexts': len(user_contexts),
@@ -1250,9 +1318,10 @@ class ContextManager:
     
     async def _update_context_statistics(self):
         """Update context statistics"""
+        current_time = time.time()
         active_count = sum(
             1 for context in self.contexts.values()
-            if not (context.expires_at and time.time() > context.expires_at)
+            if not (context.expires_at and current_time > context.expires_at)
         )
         
         self.context_stats['active_contexts'] = active_count
@@ -10,20 +10,22 @@ This module provides the core memory engine that enables AI systems to:
 """
 
 import asyncio
+import heapq
 import json
 import time
 import uuid
 import hashlib
+import itertools
 import sqlite3
 import pickle
 import logging
-from typing import Dict, List, Any, Optional, Union, Tuple
+from typing import Dict, List, Any, Optional, Union, Tuple, Set
 from dataclasses import dataclass, asdict
 from enum import Enum
 from pathlib import Path
 from datetime import datetime, timedelta
 import numpy as np
-from collections import defaultdict
+from collections import defaultdict, Counter
 
 
 class MemoryType(Enum):
@@ -120,13 +122,27 @@ class MemoryEngine:
         self.max_total_memories = self.config.get('max_total_memories', 10000)
         self.enable_embeddings = self.config.get('enable_embeddings', True)
         self.enable_decay = self.config.get('enable_decay', True)
+        self.max_concurrent_db_ops = self.config.get('max_concurrent_db_ops', 8)
+        self.access_flush_interval = self.config.get('access_flush_interval', 0.05)
+        self.access_flush_batch_size = self.config.get('access_flush_batch_size', 1000)
         
         # Memory storage
         self.memories = {}  # In-memory cache
+        self._id_counter = itertools.count(int(time.time() * 1000000))
         self.working_memory = {}  # Active working memory
+        self._working_memory_heap = []  # (last_accessed, memory ID) min-heap for eviction
         self.memory_index = {}  # Fast lookup index
         self.tag_index = defaultdict(set)  # Tag-based index
         self.type_index = defaultdict(set)  # Type-based index
+        self.priority_index = defaultdict(set)  # Priority-based index
+        self.token_index = defaultdict(set)  # Content token-based index
+        self._memory_tokens = {}  # Memory ID -> indexed content tokens
+        
+        # Embedding index: L2-normalized embeddings of cached memories stored
+        # row-wise so similarity search is a single matrix-vector product
+        self._embedding_matrix = None
+        self._embedding_ids = []  # Row -> memory ID
+        self._embedding_rows = {}  # Memory ID -> row
         
         # Memory statistics
         self.memory_stats = {
@@ -139,18 +155,42 @@ class MemoryEngine:
             'average_retrieval_time': 0.0
         }
         
+        # Generation counter bumped whenever the cached set of memories or
+        # their indexed fields change; derived caches are valid for one generation
+        self._memory_generation = 0
+        self._distribution_cache_generation = -1
+        self._distribution_cache = {}
+        
         # Memory optimization
         self.last_optimization = time.time()
         self.optimization_interval = 3600.0  # 1 hour
         
-        # Initialize database
-        self._initialize_database()
+        # Initialize database in the executor (creating indices on a large existing
+        # database can take a while); database calls wait for it in _run_db and
+        # initialize() surfaces its errors
+        self._db_semaphore = asyncio.Semaphore(self.max_concurrent_db_ops)
+        self._db_ready = asyncio.get_running_loop().run_in_executor(None, self._initialize_database)
+        
+        # Access statistics are written behind by a single background writer so
+        # retrievals and searches don't wait for a database commit per memory
+        self._access_write_queue = asyncio.Queue()
+        self._access_writer_task = asyncio.create_task(self._access_writer_loop())
         
         # Load existing memories
-        asyncio.create_task(self._load_memories_from_db())
+        self._load_task = asyncio.create_task(self._load_memories_from_db())
         
         self.logger.info("MemoryEngine initialized")
     
+    async def initialize(self):
+        """
+        Wait until the database is initialized and existing memories are loaded
+        
+        Raises:
+            Exception: The error that stopped the database from initializing
+        """
+        await asyncio.shield(self._db_ready)
+        await asyncio.shield(self._load_task)
+    
     async def store_memory(
         self, 
         content: Dict[str, Any], 
@@ -176,7 +216,7 @@ class MemoryEngine:
         
         try:
             # Generate memory ID
-            memory_id = self._generate_memory_id(content, memory_type)
+            memory_id = self._generate_memory_id()
             
             # Create memory object
             memory = Memory(
@@ -184,8 +224,8 @@ class MemoryEngine:
                 memory_type=memory_type,
                 content=content,
                 metadata=metadata or {},
-                created_at=time.time(),
-                last_accessed=time.time(),
+                created_at=start_time,
+                last_accessed=start_time,
                 access_count=1,
                 priority=priority,
                 status=MemoryStatus.ACTIVE,
@@ -197,13 +237,13 @@ class MemoryEngine:
             
             # Generate embedding if enabled
             if self.enable_embeddings:
-                memory.embedding = await self._generate_embedding(content)
+                memory.embedding = self._generate_embedding(content)
             
             # Store in cache and database
             await self._store_memory_internal(memory)
             
             # Update indices
-            await self._update_indices(memory)
+            self._update_indices(memory)
             
             # Find and create associations
             await self._create_associations(memory)
@@ -215,7 +255,7 @@ class MemoryEngine:
             # Update statistics
             self._update_memory_stats('store', time.time() - start_time)
             
-            self.logger.info(f"Memory stored: {memory_id} ({memory_type.value})")
+            self.logger.info("Memory stored: %s (%s)", memory_id, memory_type.value)
             return memory_id
             
         except Exception as e:
@@ -238,7 +278,7 @@ class MemoryEngine:
             # Check cache first
             if memory_id in self.memories:
                 memory = self.memories[memory_id]
-                await self._update_memory_access(memory)
+                self._update_memory_access(memory)
                 self.memory_stats['cache_hits'] += 1
                 self._update_memory_stats('retrieve', time.time() - start_time)
                 return memory
@@ -248,7 +288,10 @@ class MemoryEngine:
             if memory:
                 # Add to cache
                 self.memories[memory_id] = memory
-                await self._update_memory_access(memory)
+                self._index_priority(memory)
+                self._index_embedding(memory)
+                self._memory_generation += 1
+                self._update_memory_access(memory)
                 self.memory_stats['cache_misses'] += 1
             
             self._update_memory_stats('retrieve', time.time() - start_time)
@@ -271,43 +314,37 @@ class MemoryEngine:
         start_time = time.time()
         
         try:
-            # Get candidate memories
+            # Get candidate memories, active ones before cold (archived/dormant) ones
+            # so that ranking ties go to the active tier
             candidates = await self._get_candidate_memories(query)
+            candidates.sort(key=lambda memory: memory.status != MemoryStatus.ACTIVE)
+            candidates_count = len(candidates)
             
-            # Score and rank memories
-            scored_memories = await self._score_memories(candidates, query)
-            
-            # Apply filters and limits
-            filtered_memories = await self._filter_memories(scored_memories, query)
-            
-            # Sort by relevance
-            sorted_memories = sorted(
-                filtered_memories, 
-                key=lambda x: x[1], 
-                reverse=True
-            )[:query.limit]
+            # Score, filter and rank all candidates in a single pass
+            sorted_memories, filtered_count = self._rank_memories(candidates, query)
             
             # Extract memories and scores
             memories = [memory for memory, score in sorted_memories]
             scores = [score for memory, score in sorted_memories]
             
             # Update access counts
+            access_time = time.time()
             for memory in memories:
-                await self._update_memory_access(memory)
+                self._update_memory_access(memory, access_time)
             
             search_time = time.time() - start_time
             
             result = MemorySearchResult(
                 memories=memories,
-                total_count=len(candidates),
+                total_count=candidates_count,
                 search_time=search_time,
                 relevance_scores=scores,
                 query_metadata={
                     'query_text': query.query_text,
                     'memory_types': [t.value for t in query.memory_types] if query.memory_types else None,
                     'tags': query.tags,
-                    'candidates_count': len(candidates),
-                    'filtered_count': len(filtered_memories)
+                    'candidates_count': candidates_count,
+                    'filtered_count': filtered_count
                 }
             )
             
@@ -348,15 +385,15 @@ class MemoryEngine:
             
             # Regenerate embedding if content changed
             if 'content' in updates and self.enable_embeddings:
-                memory.embedding = await self._generate_embedding(memory.content)
+                memory.embedding = self._generate_embedding(memory.content)
             
             # Update in database
             await self._update_memory_in_db(memory)
             
             # Update indices
-            await self._update_indices(memory)
+            self._update_indices(memory)
             
-            self.logger.info(f"Memory updated: {memory_id}")
+            self.logger.info("Memory updated: %s", memory_id)
             return True
             
         except Exception as e:
@@ -379,7 +416,7 @@ class MemoryEngine:
                 memory = self.memories[memory_id]
                 
                 # Remove from indices
-                await self._remove_from_indices(memory)
+                self._remove_from_indices(memory)
                 
                 # Remove from cache
                 del self.memories[memory_id]
@@ -390,7 +427,7 @@ class MemoryEngine:
             # Update statistics
             self.memory_stats['total_memories'] -= 1
             
-            self.logger.info(f"Memory deleted: {memory_id}")
+            self.logger.info("Memory deleted: %s", memory_id)
             return True
             
         except Exception as e:
@@ -417,24 +454,21 @@ class MemoryEngine:
             if not source_memory:
                 return []
             
-            related_memories = []
-            
-            # Get directly associated memories
-            for assoc_id in source_memory.associations:
-                assoc_memory = await self.retrieve_memory(assoc_id)
-                if assoc_memory:
-                    related_memories.append(assoc_memory)
+            # Get directly associated memories and memories with similar tags,
+            # loading every distinct ID once and concurrently
+            tag_ids = self._find_memory_ids_by_tags(source_memory.tags, exclude_id=memory_id)
+            load_ids = list(dict.fromkeys(itertools.chain(source_memory.associations, tag_ids)))
+            loaded = dict(zip(load_ids, await asyncio.gather(
+                *(self.retrieve_memory(load_id) for load_id in load_ids)
+            )))
             
-            # Get memories with similar tags
-            tag_related = await self._find_memories_by_tags(
-                source_memory.tags, 
-                exclude_id=memory_id
-            )
+            related_memories = [loaded[assoc_id] for assoc_id in source_memory.associations if loaded[assoc_id]]
+            tag_related = [loaded[tag_id] for tag_id in tag_ids if loaded[tag_id]]
             related_memories.extend(tag_related[:max_results - len(related_memories)])
             
             # Get memories with similar content (if embeddings enabled)
             if self.enable_embeddings and source_memory.embedding:
-                similar_memories = await self._find_similar_memories(
+                similar_memories = self._find_similar_memories(
                     source_memory.embedding,
                     exclude_id=memory_id,
                     max_results=max_results - len(related_memories)
@@ -530,22 +564,67 @@ class MemoryEngine:
             )
         })
         
-        # Add memory distribution by type
+        # Add memory distribution by type and priority
+        stats.update(self._get_memory_distribution())
+        
+        return stats
+    
+    async def flush_access_stats(self):
+        """Wait until all queued access statistics have been written to the database"""
+        if not self._access_writer_task.done():
+            await self._access_write_queue.join()
+            return
+        
+        # Writer is gone (engine closed); write any remaining updates through
+        batch = {}
+        while not self._access_write_queue.empty():
+            memory = self._access_write_queue.get_nowait()
+            batch[memory.memory_id] = memory
+            self._access_write_queue.task_done()
+        
+        if batch:
+            await self._save_access_stats(batch)
+    
+    async def close(self):
+        """
+        Flush queued access statistics and stop the background writer
+        
+        Call before the event loop shuts down; access statistics queued after
+        close() are written through by the next flush_access_stats() call.
+        """
+        await self.flush_access_stats()
+        
+        self._access_writer_task.cancel()
+        try:
+            await self._access_writer_task
+        except asyncio.CancelledError:
+            pass
+        
+        self.logger.info("MemoryEngine closed")
+    
+    def _get_memory_distribution(self) -> Dict[str, int]:
+        """Get memory distribution by type and priority, cached per generation"""
+        if self._distribution_cache_generation == self._memory_generation:
+            return self._distribution_cache
+        
+        distribution = {}
+        
         for memory_type in MemoryType:
-            stats[f'memories_{memory_type.value}'] = len(self.type_index.get(memory_type, set()))
+            distribution[f'memories_{memory_type.value}'] = len(self.type_index.get(memory_type, set()))
         
-        # Add memory distribution by priority
+        priority_counts = Counter(memory.priority for memory in self.memories.values())
         for priority in MemoryPriority:
-            count = sum(1 for memory in self.memories.values() if memory.priority == priority)
-            stats[f'memories_priority_{priority.value}'] = count
+            distribution[f'memories_priority_{priority.value}'] = priority_counts[priority]
         
-        return stats
+        self._distribution_cache = distribution
+        self._distribution_cache_generation = self._memory_generation
+        return distribution
     
-    def _generate_memory_id(self, content: Dict[str, Any], memory_type: MemoryType) -> str:
+    def _generate_memory_id(self) -> str:
         """Generate unique memory ID"""
-        content_str = json.dumps(content, sort_keys=True)
-        hash_input = f"{content_str}_{memory_type.value}_{time.time()}"
-        return hashlib.sha256(hash_input.encode()).hexdigest()[:16]
+        # 16 hex digits from a counter seeded with the start time in microseconds:
+        # unique within the process and ordered by creation across restarts
+        return f"{next(self._id_counter):016x}"
     
     def _calculate_importance_score(
         self, 
@@ -589,7 +668,7 @@ class MemoryEngine:
         
         return max(0.0, min(1.0, final_score))
     
-    async def _generate_embedding(self, content: Dict[str, Any]) -> List[float]:
+    def _generate_embedding(self, content: Dict[str, Any]) -> List[float]:
         """Generate embedding for memory content"""
         # Simplified embedding generation
         # In a real implementation, this would use a proper embedding model
@@ -614,8 +693,16 @@ class MemoryEngine:
         self.memory_stats['memories_by_type'][memory.memory_type] += 1
         self.memory_stats['memories_by_priority'][memory.priority] += 1
     
-    async def _update_indices(self, memory: Memory):
-        """Update memory indices"""
+    def _update_indices(self, memory: Memory, index_embedding: bool = True):
+        """Update memory indices
+        
+        Args:
+            memory: Memory to index
+            index_embedding: Whether to index the embedding now; bulk loads
+                pass False and add embeddings via _index_embeddings instead
+        """
+        self._memory_generation += 1
+        
         # Update tag index
         for tag in memory.tags:
             self.tag_index[tag].add(memory.memory_id)
@@ -623,6 +710,16 @@ class MemoryEngine:
         # Update type index
         self.type_index[memory.memory_type].add(memory.memory_id)
         
+        # Update priority index
+        self._index_priority(memory)
+        
+        # Update content token index
+        self._index_tokens(memory)
+        
+        # Update embedding index
+        if index_embedding:
+            self._index_embedding(memory)
+        
         # Update main index
         self.memory_index[memory.memory_id] = {
             'type': memory.memory_type,
@@ -632,8 +729,10 @@ class MemoryEngine:
             'importance_score': memory.importance_score
         }
     
-    async def _remove_from_indices(self, memory: Memory):
+    def _remove_from_indices(self, memory: Memory):
         """Remove memory from indices"""
+        self._memory_generation += 1
+        
         # Remove from tag index
         for tag in memory.tags:
             self.tag_index[tag].discard(memory.memory_id)
@@ -643,60 +742,211 @@ class MemoryEngine:
         # Remove from type index
         self.type_index[memory.memory_type].discard(memory.memory_id)
         
+        # Remove from priority index
+        for memory_ids in self.priority_index.values():
+            memory_ids.discard(memory.memory_id)
+        
+        # Remove from content token index
+        self._unindex_tokens(memory.memory_id)
+        
+        # Remove from embedding index
+        self._unindex_embedding(memory.memory_id)
+        
         # Remove from main index
         self.memory_index.pop(memory.memory_id, None)
     
+    def _index_priority(self, memory: Memory):
+        """Add or move a memory in the priority index"""
+        for priority, memory_ids in self.priority_index.items():
+            if priority != memory.priority:
+                memory_ids.discard(memory.memory_id)
+        
+        self.priority_index[memory.priority].add(memory.memory_id)
+    
+    def _tokenize_content(self, content: Dict[str, Any]) -> frozenset:
+        """Tokenize memory content the same way text similarity does"""
+        return frozenset(json.dumps(content).lower().split())
+    
+    def _index_tokens(self, memory: Memory):
+        """Add or refresh a memory's content tokens in the token index"""
+        tokens = self._tokenize_content(memory.content)
+        old_tokens = self._memory_tokens.get(memory.memory_id, frozenset())
+        
+        for token in old_tokens - tokens:
+            self.token_index[token].discard(memory.memory_id)
+            if not self.token_index[token]:
+                del self.token_index[token]
+        
+        for token in tokens - old_tokens:
+            self.token_index[token].add(memory.memory_id)
+        
+        self._memory_tokens[memory.memory_id] = tokens
+    
+    def _unindex_tokens(self, memory_id: str):
+        """Remove a memory's content tokens from the token index"""
+        for token in self._memory_tokens.pop(memory_id, frozenset()):
+            self.token_index[token].discard(memory_id)
+            if not self.token_index[token]:
+                del self.token_index[token]
+    
+    def _index_embedding(self, memory: Memory):
+        """Add or refresh a memory's row in the embedding index"""
+        if not memory.embedding:
+            self._unindex_embedding(memory.memory_id)
+            return
+        
+        vector = np.asarray(memory.embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        
+        if self._embedding_matrix is None:
+            self._embedding_matrix = np.zeros((64, vector.shape[0]), dtype=np.float32)
+        
+        # Embeddings of a different dimension never match (see _cosine_similarity)
+        if norm == 0 or vector.shape[0] != self._embedding_matrix.shape[1]:
+            self._unindex_embedding(memory.memory_id)
+            return
+        
+        row = self._embedding_rows.get(memory.memory_id)
+        if row is None:
+            row = len(self._embedding_ids)
+            if row == self._embedding_matrix.shape[0]:
+                # Grow capacity geometrically to keep appends amortized O(1)
+                self._embedding_matrix = np.resize(
+                    self._embedding_matrix, 
+                    (row * 2, self._embedding_matrix.shape[1])
+                )
+            self._embedding_ids.append(memory.memory_id)
+            self._embedding_rows[memory.memory_id] = row
+        
+        self._embedding_matrix[row] = vector / norm
+    
+    def _index_embeddings(self, memories: List[Memory]):
+        """Add embeddings of many new memories to the embedding index at once"""
+        new_memories = [
+            memory for memory in memories 
+            if memory.embedding and memory.memory_id not in self._embedding_rows
+        ]
+        if not new_memories:
+            return
+        
+        if self._embedding_matrix is None:
+            dimension = len(new_memories[0].embedding)
+        else:
+            dimension = self._embedding_matrix.shape[1]
+        
+        # Embeddings of a different dimension never match (see _cosine_similarity)
+        new_memories = [m for m in new_memories if len(m.embedding) == dimension]
+        if not new_memories:
+            return
+        
+        vectors = np.asarray([m.embedding for m in new_memories], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1)
+        keep = np.flatnonzero(norms > 0)
+        if len(keep) == 0:
+            return
+        
+        start = len(self._embedding_ids)
+        end = start + len(keep)
+        if self._embedding_matrix is None:
+            self._embedding_matrix = np.zeros((max(64, end), dimension), dtype=np.float32)
+        elif end > self._embedding_matrix.shape[0]:
+            self._embedding_matrix = np.resize(
+                self._embedding_matrix, 
+                (max(end, self._embedding_matrix.shape[0] * 2), dimension)
+            )
+        
+        self._embedding_matrix[start:end] = vectors[keep] / norms[keep, None]
+        for row, i in enumerate(keep.tolist(), start):
+            memory_id = new_memories[i].memory_id
+            self._embedding_ids.append(memory_id)
+            self._embedding_rows[memory_id] = row
+    
+    def _unindex_embedding(self, memory_id: str):
+        """Remove a memory's row from the embedding index"""
+        row = self._embedding_rows.pop(memory_id, None)
+        if row is None:
+            return
+        
+        # Move the last row into the freed slot
+        last_id = self._embedding_ids.pop()
+        if last_id != memory_id:
+            self._embedding_matrix[row] = self._embedding_matrix[len(self._embedding_ids)]
+            self._embedding_ids[row] = last_id
+            self._embedding_rows[last_id] = row
+    
     async def _create_associations(self, memory: Memory):
         """Create associations with related memories"""
-        # Find memories with similar tags
-        similar_memories = []
-        for tag in memory.tags:
-            if tag in self.tag_index:
-                for memory_id in self.tag_index[tag]:
-                    if memory_id != memory.memory_id:
-                        similar_memories.append(memory_id)
+        # Find memories with similar tags, counting the tags each one shares
+        shared_tags = Counter(itertools.chain.from_iterable(
+            self.tag_index.get(tag, ()) for tag in set(memory.tags)
+        ))
+        shared_tags.pop(memory.memory_id, None)
         
-        # Add associations (limit to top 5)
-        memory.associations = list(set(similar_memories))[:5]
+        # Add associations (limit to top 5, most shared tags first)
+        memory.associations = [memory_id for memory_id, _ in shared_tags.most_common(5)]
         
-        # Update reverse associations
+        # Update reverse associations, writing the changed memories in one transaction
+        updated = []
         for assoc_id in memory.associations:
             assoc_memory = await self.retrieve_memory(assoc_id)
             if assoc_memory and memory.memory_id not in assoc_memory.associations:
                 assoc_memory.associations.append(memory.memory_id)
-                await self._update_memory_in_db(assoc_memory)
+                updated.append(assoc_memory)
+        
+        await self._save_memories_to_db(updated)
     
     async def _manage_working_memory(self, memory: Memory):
         """Manage working memory capacity"""
-        self.working_memory[memory.memory_id] = memory
+        self._add_working_memory(memory)
         
-        # Remove oldest working memories if capacity exceeded
-        if len(self.working_memory) > self.max_working_memory:
-            # Sort by last accessed time
-            sorted_memories = sorted(
-                self.working_memory.items(),
-                key=lambda x: x[1].last_accessed
-            )
+        # Remove least recently accessed working memories if capacity exceeded.
+        # Heap keys go stale when a memory is accessed, so entries are checked
+        # on pop and re-pushed with the current access time (lazy update).
+        demoted = []
+        while len(self.working_memory) > self.max_working_memory:
+            last_accessed, memory_id = heapq.heappop(self._working_memory_heap)
             
-            # Remove oldest memories
-            for memory_id, old_memory in sorted_memories[:-self.max_working_memory]:
-                del self.working_memory[memory_id]
-                # Convert to regular memory or archive
-                old_memory.memory_type = MemoryType.EPISODIC
-                old_memory.priority = MemoryPriority.LOW
-                await self._update_memory_in_db(old_memory)
+            old_memory = self.working_memory.get(memory_id)
+            if old_memory is None:
+                continue
+            if old_memory.last_accessed != last_accessed:
+                heapq.heappush(self._working_memory_heap, (old_memory.last_accessed, memory_id))
+                continue
+            
+            del self.working_memory[memory_id]
+            # Convert to regular memory or archive
+            old_memory.memory_type = MemoryType.EPISODIC
+            old_memory.priority = MemoryPriority.LOW
+            self._index_priority(old_memory)
+            self._memory_generation += 1
+            demoted.append(old_memory)
+        
+        await self._save_memories_to_db(demoted)
+    
+    def _add_working_memory(self, memory: Memory):
+        """Add a memory to working memory and its eviction heap"""
+        self.working_memory[memory.memory_id] = memory
+        heapq.heappush(self._working_memory_heap, (memory.last_accessed, memory.memory_id))
+        
+        # Drop entries of memories that left working memory once they dominate the heap
+        if len(self._working_memory_heap) > 2 * len(self.working_memory) + 64:
+            self._working_memory_heap = [
+                (working.last_accessed, memory_id) 
+                for memory_id, working in self.working_memory.items()
+            ]
+            heapq.heapify(self._working_memory_heap)
     
-    async def _update_memory_access(self, memory: Memory):
+    def _update_memory_access(self, memory: Memory, access_time: Optional[float] = None):
         """Update memory access statistics"""
-        memory.last_accessed = time.time()
+        memory.last_accessed = access_time if access_time is not None else time.time()
         memory.access_count += 1
         
         # Update importance score based on access pattern
         access_boost = min(0.1, memory.access_count * 0.01)
         memory.importance_score = min(1.0, memory.importance_score + access_boost)
         
-        # Update in database
-        await self._update_memory_in_db(memory)
+        # Queue the database update for the background writer
+        self._access_write_queue.put_nowait(memory)
         
         # Update statistics
         self.memory_stats['total_accesses'] += 1
@@ -717,9 +967,13 @@ class MemoryEngine:
     def _initialize_database(self):
         """Initialize SQLite database for persistent storage"""
         try:
-            conn = sqlite3.connect(self.memory_db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
+            # Write-ahead logging lets readers proceed during writes and avoids
+            # rewriting the main database file on every commit (persistent setting)
+            cursor.execute('PRAGMA journal_mode=WAL')
+            
             # Create memories table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS memories (
@@ -746,6 +1000,11 @@ class MemoryEngine:
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_last_accessed ON memories(last_accessed)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_priority ON memories(priority)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_importance ON memories(importance_score)')
+            # Matches the startup cache query so it reads in index order without sorting
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_status_importance 
+                ON memories(status, importance_score DESC, last_accessed DESC)
+            ''')
             
             conn.commit()
             conn.close()
@@ -759,33 +1018,20 @@ class MemoryEngine:
     async def _load_memories_from_db(self):
         """Load existing memories from database"""
         try:
-            conn = sqlite3.connect(self.memory_db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT COUNT(*) FROM memories WHERE status = ?', (MemoryStatus.ACTIVE.value,))
-            total_count = cursor.fetchone()[0]
+            # Rows are decoded in the worker thread, off the event loop
+            memories = await self._run_db(self._read_cached_memories)
             
-            # Load recent and important memories into cache
-            cursor.execute('''
-                SELECT * FROM memories 
-                WHERE status = ? 
-                ORDER BY importance_score DESC, last_accessed DESC 
-                LIMIT ?
-            ''', (MemoryStatus.ACTIVE.value, min(1000, total_count)))
-            
-            rows = cursor.fetchall()
-            
-            for row in rows:
-                memory = self._row_to_memory(row)
+            for memory in memories:
                 self.memories[memory.memory_id] = memory
-                await self._update_indices(memory)
+                self._update_indices(memory, index_embedding=False)
                 
                 if memory.memory_type == MemoryType.WORKING:
-                    self.working_memory[memory.memory_id] = memory
+                    self._add_working_memory(memory)
             
-            conn.close()
+            # Build the embedding index in one batch
+            self._index_embeddings(memories)
             
-            self.logger.info(f"Loaded {len(rows)} memories from database")
+            self.logger.info(f"Loaded {len(memories)} memories from database")
             
         except Exception as e:
             self.logger.error(f"Failed to load memories from database: {str(e)}")
@@ -793,29 +1039,43 @@ class MemoryEngine:
     async def _save_memory_to_db(self, memory: Memory):
         """Save memory to database"""
         try:
-            conn = sqlite3.connect(self.memory_db_path)
-            cursor = conn.cursor()
+            # Serialize on the event loop so the row is a consistent snapshot
+            row = self._memory_to_row(memory)
+            await self._run_db(self._write_memory_row, row)
+            self._requeue_access_since(memory, row)
             
-            cursor.execute('''
-                INSERT OR REPLACE INTO memories VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', self._memory_to_row(memory))
+        except Exception as e:
+            self.logger.error(f"Failed to save memory to database: {str(e)}")
+    
+    async def _save_memories_to_db(self, memories: List[Memory]):
+        """Save several memories to database in a single transaction"""
+        if not memories:
+            return
+        
+        try:
+            rows = [self._memory_to_row(memory) for memory in memories]
+            await self._run_db(self._write_memory_rows, rows)
             
-            conn.commit()
-            conn.close()
+            for memory, row in zip(memories, rows):
+                self._requeue_access_since(memory, row)
             
         except Exception as e:
-            self.logger.error(f"Failed to save memory to database: {str(e)}")
+            self.logger.error(f"Failed to save {len(memories)} memories to database: {str(e)}")
+    
+    def _requeue_access_since(self, memory: Memory, row: tuple):
+        """
+        Queue the access statistics again if they changed after the row was serialized
+        
+        A queued access update is an UPDATE, which matches no row if it runs before
+        the memory's pending INSERT; writing it again afterwards keeps it from being lost.
+        """
+        if (row[5], row[6], row[13]) != (memory.last_accessed, memory.access_count, memory.importance_score):
+            self._access_write_queue.put_nowait(memory)
     
     async def _load_memory_from_db(self, memory_id: str) -> Optional[Memory]:
         """Load specific memory from database"""
         try:
-            conn = sqlite3.connect(self.memory_db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT * FROM memories WHERE memory_id = ?', (memory_id,))
-            row = cursor.fetchone()
-            
-            conn.close()
+            row = await self._run_db(self._read_memory_row, memory_id)
             
             if row:
                 return self._row_to_memory(row)
@@ -832,16 +1092,132 @@ class MemoryEngine:
     async def _delete_memory_from_db(self, memory_id: str):
         """Delete memory from database"""
         try:
-            conn = sqlite3.connect(self.memory_db_path)
-            cursor = conn.cursor()
+            await self._run_db(self._delete_memory_row, memory_id)
+            
+        except Exception as e:
+            self.logger.error(f"Failed to delete memory from database: {str(e)}")
+    
+    async def _access_writer_loop(self):
+        """Write queued access statistics to the database in batches"""
+        queue = self._access_write_queue
+        while True:
+            memory = await queue.get()
+            
+            # Give concurrent accesses a moment to queue up, then drain them;
+            # repeated accesses to a memory collapse into one row
+            batch = {memory.memory_id: memory}
+            taken = 1
+            try:
+                await asyncio.sleep(self.access_flush_interval)
+                while len(batch) < self.access_flush_batch_size and not queue.empty():
+                    memory = queue.get_nowait()
+                    batch[memory.memory_id] = memory
+                    taken += 1
+                
+                await self._save_access_stats(batch)
+                
+            finally:
+                # Lets flush_access_stats() wait on queue.join()
+                for _ in range(taken):
+                    queue.task_done()
+    
+    async def _save_access_stats(self, batch: Dict[str, Memory]):
+        """Write the access statistics of a batch of memories (memory ID -> memory)"""
+        try:
+            rows = [
+                (memory.last_accessed, memory.access_count, memory.importance_score, memory_id)
+                for memory_id, memory in batch.items()
+            ]
+            await self._run_db(self._write_access_rows, rows)
             
-            cursor.execute('DELETE FROM memories WHERE memory_id = ?', (memory_id,))
+        except Exception as e:
+            self.logger.error(f"Failed to save access statistics for {len(batch)} memories: {str(e)}")
+    
+    async def _run_db(self, func, *args):
+        """
+        Run a blocking database call in the default executor so it doesn't stall the event loop
+        
+        Waits for database initialization first and re-raises its error if it failed.
+        """
+        # Shielded so a cancelled caller doesn't cancel initialization for everyone
+        await asyncio.shield(self._db_ready)
+        
+        # Bound in-flight calls so large fan-outs (e.g. related memory loads) queue here
+        # instead of flooding the shared executor
+        async with self._db_semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, func, *args)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection to the memory database"""
+        conn = sqlite3.connect(self.memory_db_path)
+        # In WAL mode NORMAL only syncs at checkpoints instead of on every commit
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+    
+    def _read_cached_memories(self) -> List[Memory]:
+        """Read and decode the recent and important memories that are kept in the cache"""
+        conn = self._connect()
+        try:
+            # Load recent and important memories into cache, decoding rows as
+            # they are stepped rather than materializing them first
+            cursor = conn.execute('''
+                SELECT * FROM memories 
+                WHERE status = ? 
+                ORDER BY importance_score DESC, last_accessed DESC 
+                LIMIT 1000
+            ''', (MemoryStatus.ACTIVE.value,))
             
+            return [self._row_to_memory(row) for row in cursor]
+        finally:
+            conn.close()
+    
+    def _write_memory_row(self, row: tuple):
+        """Insert or replace a memory row"""
+        self._write_memory_rows([row])
+    
+    def _write_memory_rows(self, rows: List[tuple]):
+        """Insert or replace memory rows in one transaction"""
+        conn = self._connect()
+        try:
+            conn.executemany('''
+                INSERT OR REPLACE INTO memories VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
             conn.commit()
+        finally:
+            conn.close()
+    
+    def _write_access_rows(self, rows: List[tuple]):
+        """Update access statistics of existing memory rows in one transaction"""
+        conn = self._connect()
+        try:
+            # UPDATE rather than INSERT OR REPLACE so a memory deleted while its
+            # access update was queued is not written back
+            conn.executemany('''
+                UPDATE memories SET last_accessed = ?, access_count = ?, importance_score = ?
+                WHERE memory_id = ?
+            ''', rows)
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def _read_memory_row(self, memory_id: str) -> Optional[tuple]:
+        """Read a single memory row"""
+        conn = self._connect()
+        try:
+            cursor = conn.execute('SELECT * FROM memories WHERE memory_id = ?', (memory_id,))
+            return cursor.fetchone()
+        finally:
+            conn.close()
+    
+    def _delete_memory_row(self, memory_id: str):
+        """Delete a memory row"""
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM memories WHERE memory_id = ?', (memory_id,))
+            conn.commit()
+        finally:
             conn.close()
-            
-        except Exception as e:
-            self.logger.error(f"Failed to delete memory from database: {str(e)}")
     
     def _memory_to_row(self, memory: Memory) -> tuple:
         """Convert memory object to database row"""
@@ -911,35 +1287,86 @@ class MemoryEngine:
         
         return candidate_memories
     
-    async def _score_memories(self, memories: List[Memory], query: MemoryQuery) -> List[Tuple[Memory, float]]:
-        """Score memories based on query relevance"""
-        scored_memories = []
+    def _rank_memories(
+        self, 
+        memories: List[Memory], 
+        query: MemoryQuery
+    ) -> Tuple[List[Tuple[Memory, float]], int]:
+        """
+        Score, filter and select the top memories
         
-        for memory in memories:
-            score = 0.0
-            
-            # Base importance score
-            score += memory.importance_score * 0.3
-            
-            # Recency score
-            age_days = (time.time() - memory.created_at) / 86400
-            recency_score = max(0.0, 1.0 - (age_days / 30))  # Decay over 30 days
-            score += recency_score * 0.2
-            
-            # Access frequency score
-            access_score = min(1.0, memory.access_count / 10)
-            score += access_score * 0.2
-            
-            # Text similarity score (if query text provided)
-            if query.query_text:
-                text_score = await self._calculate_text_similarity(memory, query.query_text)
-                score += text_score * 0.3
-            
-            scored_memories.append((memory, score))
+        Candidates passing the attribute filters are scored together as
+        NumPy columns (see _score_batch), and only the scores above the
+        similarity threshold are ranked.
+        
+        Returns:
+            Tuple: (memories with scores sorted by relevance, number of memories passing the filters)
+        """
+        # Cheap attribute filters before any scoring work
+        memories = [memory for memory in memories if self._passes_filters(memory, query)]
+        if not memories:
+            return [], 0
+        
+        count = len(memories)
+        text_scores = None
+        if query.query_text:
+            text_scores = self._get_text_scores(memories, query.query_text)
+        
+        scores = self._score_batch(
+            np.fromiter((memory.importance_score for memory in memories), dtype=np.float64, count=count),
+            np.fromiter((memory.created_at for memory in memories), dtype=np.float64, count=count),
+            np.fromiter((memory.access_count for memory in memories), dtype=np.float64, count=count),
+            text_scores,
+            time.time()
+        )
+        
+        # Similarity threshold
+        passing = np.flatnonzero(scores >= query.similarity_threshold)
+        
+        top = self._top_k(passing, scores, query.limit)
+        
+        return [(memories[i], float(scores[i])) for i in top], len(passing)
+    
+    def _score_batch(
+        self, 
+        importance: np.ndarray, 
+        created_at: np.ndarray, 
+        access_count: np.ndarray, 
+        text_scores: Optional[np.ndarray], 
+        current_time: float
+    ) -> np.ndarray:
+        """Score memories for query relevance from their column arrays"""
+        # Base importance score
+        scores = importance * 0.3
+        
+        # Recency score
+        age_days = (current_time - created_at) / 86400
+        scores += np.maximum(0.0, 1.0 - (age_days / 30)) * 0.2  # Decay over 30 days
+        
+        # Access frequency score
+        scores += np.minimum(1.0, access_count / 10) * 0.2
+        
+        # Text similarity score (if query text provided)
+        if text_scores is not None:
+            scores += text_scores * 0.3
+        
+        return scores
+    
+    def _get_text_scores(self, memories: List[Memory], query_text: str) -> np.ndarray:
+        """Get text similarity of each memory to the query"""
+        index_scores = self._calculate_text_scores(query_text)
+        text_scores = np.zeros(len(memories))
+        
+        for i, memory in enumerate(memories):
+            if memory.memory_id in self._memory_tokens:
+                text_scores[i] = index_scores.get(memory.memory_id, 0.0)
+            else:
+                # Memory not in the token index (e.g. loaded on a cache miss)
+                text_scores[i] = self._calculate_text_similarity(memory, query_text)
         
-        return scored_memories
+        return text_scores
     
-    async def _calculate_text_similarity(self, memory: Memory, query_text: str) -> float:
+    def _calculate_text_similarity(self, memory: Memory, query_text: str) -> float:
         """Calculate text similarity between memory and query"""
         # Simplified text similarity calculation
         memory_text = json.dumps(memory.content).lower()
@@ -957,32 +1384,42 @@ class MemoryEngine:
         
         return similarity
     
-    async def _filter_memories(self, scored_memories: List[Tuple[Memory, float]], query: MemoryQuery) -> List[Tuple[Memory, float]]:
-        """Apply additional filters to scored memories"""
-        filtered = []
+    def _calculate_text_scores(self, query_text: str) -> Dict[str, float]:
+        """
+        Calculate text similarity for all indexed memories sharing a query word
         
-        for memory, score in scored_memories:
-            # Time range filter
-            if query.time_range:
-                start_time, end_time = query.time_range
-                if not (start_time <= memory.created_at <= end_time):
-                    continue
-            
-            # Priority filter
-            if query.priority_min:
-                if memory.priority.value > query.priority_min.value:
-                    continue
-            
-            # Similarity threshold
-            if score < query.similarity_threshold:
-                continue
-            
-            filtered.append((memory, score))
+        Equivalent to _calculate_text_similarity for every indexed memory, but
+        walks the token index postings of the query words instead of
+        re-tokenizing each memory's content. Memories absent from the result
+        share no words with the query and score 0.0.
+        """
+        query_words = set(query_text.lower().split())
+        if not query_words:
+            return {}
+        
+        matches = Counter()
+        for word in query_words:
+            matches.update(self.token_index.get(word, ()))
+        
+        return {memory_id: count / len(query_words) for memory_id, count in matches.items()}
+    
+    def _passes_filters(self, memory: Memory, query: MemoryQuery) -> bool:
+        """Apply the non-scoring query filters to a memory"""
+        # Time range filter
+        if query.time_range:
+            start_time, end_time = query.time_range
+            if not (start_time <= memory.created_at <= end_time):
+                return False
+        
+        # Priority filter
+        if query.priority_min:
+            if memory.priority.value > query.priority_min.value:
+                return False
         
-        return filtered
+        return True
     
-    async def _find_memories_by_tags(self, tags: List[str], exclude_id: str = None) -> List[Memory]:
-        """Find memories with similar tags"""
+    def _find_memory_ids_by_tags(self, tags: List[str], exclude_id: str = None) -> Set[str]:
+        """Find IDs of memories with similar tags"""
         candidate_ids = set()
         
         for tag in tags:
@@ -992,33 +1429,50 @@ class MemoryEngine:
         if exclude_id:
             candidate_ids.discard(exclude_id)
         
-        memories = []
-        for memory_id in candidate_ids:
-            memory = await self.retrieve_memory(memory_id)
-            if memory:
-                memories.append(memory)
-        
-        return memories
+        return candidate_ids
     
-    async def _find_similar_memories(self, embedding: List[float], exclude_id: str = None, max_results: int = 5) -> List[Memory]:
+    def _find_similar_memories(self, embedding: List[float], exclude_id: str = None, max_results: int = 5) -> List[Memory]:
         """Find memories with similar embeddings"""
         if not self.enable_embeddings:
             return []
         
-        similar_memories = []
+        if not self._embedding_ids or max_results <= 0:
+            return []
         
-        for memory in self.memories.values():
-            if memory.memory_id == exclude_id or not memory.embedding:
-                continue
-            
-            # Calculate cosine similarity
-            similarity = self._cosine_similarity(embedding, memory.embedding)
-            if similarity > 0.7:  # Similarity threshold
-                similar_memories.append((memory, similarity))
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0 or query.shape[0] != self._embedding_matrix.shape[1]:
+            return []
+        
+        # Cosine similarity against every indexed memory at once
+        similarities = self._embedding_matrix[:len(self._embedding_ids)] @ (query / norm)
         
-        # Sort by similarity and return top results
-        similar_memories.sort(key=lambda x: x[1], reverse=True)
-        return [memory for memory, similarity in similar_memories[:max_results]]
+        if exclude_id in self._embedding_rows:
+            similarities[self._embedding_rows[exclude_id]] = -np.inf
+        
+        # Keep rows above the similarity threshold, best first
+        matches = self._top_k(np.flatnonzero(similarities > 0.7), similarities, max_results)
+        
+        return [self.memories[self._embedding_ids[row]] for row in matches]
+    
+    def _top_k(self, indices: np.ndarray, values: np.ndarray, k: int) -> np.ndarray:
+        """Return the k indices with the highest values, best first
+        
+        Ties keep the earlier index, as a stable sort of all indices would.
+        """
+        if k <= 0:
+            return indices[:0]
+        
+        candidate_values = values[indices]
+        if k < len(indices):
+            # Partition to find the k-th best value, then only sort the candidates
+            # reaching it (including every tie at the boundary)
+            kth_value = np.partition(candidate_values, len(indices) - k)[len(indices) - k]
+            keep = candidate_values >= kth_value
+            indices = indices[keep]
+            candidate_values = candidate_values[keep]
+        
+        return indices[np.argsort(-candidate_values, kind='stable')][:k]
     
     def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
         """Calculate cosine similarity between two vectors"""
@@ -1037,28 +1491,46 @@ class MemoryEngine:
     async def _apply_memory_decay(self):
         """Apply decay to memories based on time and access patterns"""
         current_time = time.time()
+        self._memory_generation += 1
         
-        for memory in self.memories.values():
-            # Calculate decay based on age and access pattern
-            age_days = (current_time - memory.created_at) / 86400
-            time_since_access = (current_time - memory.last_accessed) / 86400
-            
-            # Decay factor calculation
-            age_decay = max(0.1, 1.0 - (age_days / 365))  # Decay over 1 year
-            access_decay = max(0.1, 1.0 - (time_since_access / 30))  # Decay if not accessed for 30 days
-            
-            memory.decay_factor = (age_decay + access_decay) / 2
-            memory.importance_score *= memory.decay_factor
-            
-            # Update in database
-            await self._update_memory_in_db(memory)
+        memories = list(self.memories.values())
+        if not memories:
+            return
+        
+        # Calculate decay based on age and access pattern for all memories at once
+        created_at = np.fromiter((m.created_at for m in memories), dtype=np.float64, count=len(memories))
+        last_accessed = np.fromiter((m.last_accessed for m in memories), dtype=np.float64, count=len(memories))
+        age_days = (current_time - created_at) / 86400
+        time_since_access = (current_time - last_accessed) / 86400
+        
+        # Decay factor calculation
+        age_decay = np.maximum(0.1, 1.0 - (age_days / 365))  # Decay over 1 year
+        access_decay = np.maximum(0.1, 1.0 - (time_since_access / 30))  # Decay if not accessed for 30 days
+        decay_factors = ((age_decay + access_decay) / 2).tolist()
+        
+        for memory, decay_factor in zip(memories, decay_factors):
+            memory.decay_factor = decay_factor
+            memory.importance_score *= decay_factor
+        
+        # Update in database
+        await self._save_memories_to_db(memories)
     
     async def _archive_old_memories(self) -> int:
         """Archive old, low-priority memories"""
-        archived_count = 0
+        archived = []
         current_time = time.time()
         
-        for memory in list(self.memories.values()):
+        # Only low-priority memories can be archived
+        candidate_ids = (
+            self.priority_index[MemoryPriority.LOW] | 
+            self.priority_index[MemoryPriority.ARCHIVE]
+        )
+        
+        for memory_id in candidate_ids:
+            memory = self.memories.get(memory_id)
+            if memory is None:
+                continue
+            
             # Archive criteria
             age_days = (current_time - memory.created_at) / 86400
             is_old = age_days > 90  # Older than 90 days
@@ -1067,17 +1539,23 @@ class MemoryEngine:
             
             if is_old and is_low_priority and is_rarely_accessed:
                 memory.status = MemoryStatus.ARCHIVED
-                await self._update_memory_in_db(memory)
-                archived_count += 1
+                self._memory_generation += 1
+                archived.append(memory)
         
-        return archived_count
+        await self._save_memories_to_db(archived)
+        return len(archived)
     
     async def _delete_expired_memories(self) -> int:
         """Delete expired memories"""
         deleted_count = 0
         current_time = time.time()
         
-        for memory in list(self.memories.values()):
+        # Only archive-priority memories can be deleted
+        for memory_id in list(self.priority_index[MemoryPriority.ARCHIVE]):
+            memory = self.memories.get(memory_id)
+            if memory is None:
+                continue
+            
             # Delete criteria
             age_days = (current_time - memory.created_at) / 86400
             is_very_old = age_days > 365  # Older than 1 year
@@ -1092,34 +1570,37 @@ class MemoryEngine:
     
     async def _update_all_associations(self) -> int:
         """Update associations for all memories"""
-        updated_count = 0
+        updated = []
         
-        for memory in self.memories.values():
+        for memory in list(self.memories.values()):
             old_associations = memory.associations.copy()
             await self._create_associations(memory)
             
             if memory.associations != old_associations:
-                await self._update_memory_in_db(memory)
-                updated_count += 1
+                updated.append(memory)
         
-        return updated_count
+        await self._save_memories_to_db(updated)
+        return len(updated)
     
     async def _optimize_cache(self) -> bool:
         """Optimize memory cache"""
         try:
             # Remove least recently used memories if cache is too large
             if len(self.memories) > self.max_total_memories:
-                # Sort by last accessed time
-                sorted_memories = sorted(
+                # Select the least recently accessed memories
+                memories_to_remove = len(self.memories) - self.max_total_memories
+                oldest_memories = heapq.nsmallest(
+                    memories_to_remove,
                     self.memories.items(),
                     key=lambda x: x[1].last_accessed
                 )
                 
                 # Remove oldest memories from cache (but keep in database)
-                memories_to_remove = len(self.memories) - self.max_total_memories
-                for memory_id, memory in sorted_memories[:memories_to_remove]:
+                for memory_id, memory in oldest_memories:
                     if memory.memory_type != MemoryType.WORKING:  # Keep working memory
                         del self.memories[memory_id]
+                        self._unindex_embedding(memory_id)
+                        self._memory_generation += 1
             
             return True
             
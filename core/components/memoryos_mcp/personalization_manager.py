@@ -9,13 +9,14 @@ based on interaction patterns and feedback.
 import asyncio
 import json
 import time
-import uuid
+import heapq
+import itertools
 import logging
 import numpy as np
 from typing import Dict, List, Any, Optional, Union, Tuple, Callable
 from dataclasses import dataclass, asdict
 from enum import Enum
-from collections import defaultdict, deque
+from collections import defaultdict, deque, Counter
 from datetime import datetime, timedelta
 
 
@@ -126,8 +127,9 @@ class PersonalizationManager:
         # User profiles and data
         self.user_profiles = {}
         self.personalization_rules = {}
+        self._id_counter = itertools.count(int(time.time() * 1000000))  # Adaptation event IDs
         self.adaptation_history = defaultdict(list)
-        self.interaction_patterns = defaultdict(list)
+        self.interaction_patterns = defaultdict(lambda: deque(maxlen=self.max_history_size))
         
         # Learning and adaptation
         self.learning_models = {}
@@ -398,7 +400,7 @@ class PersonalizationManager:
             
             # Create adaptation event
             adaptation_event = AdaptationEvent(
-                event_id=f"adapt_{uuid.uuid4().hex[:8]}",
+                event_id=f"adapt_{next(self._id_counter):016x}",
                 user_id=user_id,
                 dimension=dimension,
                 old_value=old_value,
@@ -638,11 +640,8 @@ class PersonalizationManager:
             'user_satisfaction': interaction_data.get('satisfaction', 0.5)
         }
         
+        # Bounded deque drops the oldest pattern once max_history_size is reached
         patterns.append(pattern)
-        
-        # Limit pattern history
-        if len(patterns) > self.max_history_size:
-            patterns[:] = patterns[-self.max_history_size:]
     
     async def _learn_from_interaction(self, profile: UserProfile, interaction_data: Dict[str, Any]) -> List[AdaptationEvent]:
         """Learn from user interaction and generate adaptations"""
@@ -694,7 +693,7 @@ class PersonalizationManager:
         
         if adjustments:
             return AdaptationEvent(
-                event_id=f"comm_adapt_{uuid.uuid4().hex[:8]}",
+                event_id=f"comm_adapt_{next(self._id_counter):016x}",
                 user_id=profile.user_id,
                 dimension=PersonalizationDimension.COMMUNICATION_STYLE,
                 old_value=profile.communication_style.copy(),
@@ -728,7 +727,7 @@ class PersonalizationManager:
         
         if adjustments:
             return AdaptationEvent(
-                event_id=f"task_adapt_{uuid.uuid4().hex[:8]}",
+                event_id=f"task_adapt_{next(self._id_counter):016x}",
                 user_id=profile.user_id,
                 dimension=PersonalizationDimension.TASK_PREFERENCES,
                 old_value=profile.task_preferences.copy(),
@@ -754,7 +753,7 @@ class PersonalizationManager:
             # Reduce complexity tolerance if task was too complex
             if outcome.get('reason') == 'too_complex':
                 adaptation = AdaptationEvent(
-                    event_id=f"outcome_adapt_{uuid.uuid4().hex[:8]}",
+                    event_id=f"outcome_adapt_{next(self._id_counter):016x}",
                     user_id=profile.user_id,
                     dimension=PersonalizationDimension.COMPLEXITY_TOLERANCE,
                     old_value=profile.task_preferences.get('complexity_tolerance', 0.5),
@@ -770,7 +769,7 @@ class PersonalizationManager:
         if satisfaction < 0.3:
             # Low satisfaction - adjust communication style to be more supportive
             adaptation = AdaptationEvent(
-                event_id=f"satisfaction_adapt_{uuid.uuid4().hex[:8]}",
+                event_id=f"satisfaction_adapt_{next(self._id_counter):016x}",
                 user_id=profile.user_id,
                 dimension=PersonalizationDimension.COMMUNICATION_STYLE,
                 old_value=profile.communication_style.get('supportiveness', 0.7),
@@ -1006,7 +1005,7 @@ class PersonalizationManager:
             dimension = PersonalizationDimension(feedback_dimension)
             
             adaptation = AdaptationEvent(
-                event_id=f"explicit_adapt_{uuid.uuid4().hex[:8]}",
+                event_id=f"explicit_adapt_{next(self._id_counter):016x}",
                 user_id=profile.user_id,
                 dimension=dimension,
                 old_value=await self._get_dimension_value(profile, dimension),
@@ -1033,7 +1032,7 @@ class PersonalizationManager:
             }
             
             adaptation = AdaptationEvent(
-                event_id=f"implicit_adapt_{uuid.uuid4().hex[:8]}",
+                event_id=f"implicit_adapt_{next(self._id_counter):016x}",
                 user_id=profile.user_id,
                 dimension=PersonalizationDimension.TASK_PREFERENCES,
                 old_value=profile.task_preferences.copy(),
@@ -1184,8 +1183,8 @@ class PersonalizationManager:
             task_rates[task_type] = sum(successes) / len(successes)
         
         # Return top 3 task types by success rate
-        sorted_tasks = sorted(task_rates.items(), key=lambda x: x[1], reverse=True)
-        return [task_type for task_type, rate in sorted_tasks[:3]]
+        top_tasks = heapq.nlargest(3, task_rates.items(), key=lambda x: x[1])
+        return [task_type for task_type, rate in top_tasks]
     
     def _get_peak_performance_time(self, interactions: List[Dict[str, Any]]) -> str:
         """Get user's peak performance time"""
@@ -1208,9 +1207,7 @@ class PersonalizationManager:
         if not adaptations:
             return {}
         
-        dimension_counts = defaultdict(int)
-        for adaptation in adaptations:
-            dimension_counts[adaptation.dimension.value] += 1
+        dimension_counts = Counter(adaptation.dimension.value for adaptation in adaptations)
         
         total_adaptations = len(adaptations)
         return {
@@ -1354,13 +1351,10 @@ class PersonalizationManager:
     
     def _get_personality_distribution(self) -> Dict[str, int]:
         """Get distribution of personality types"""
-        distribution = defaultdict(int)
-        
-        for profile in self.user_profiles.values():
-            if profile.personality_type:
-                distribution[profile.personality_type.value] += 1
-            else:
-                distribution['unknown'] += 1
+        distribution = Counter(
+            profile.personality_type.value if profile.personality_type else 'unknown'
+            for profile in self.user_profiles.values()
+        )
         
         return dict(distribution)
 
@@ -331,7 +331,8 @@ class IntelligentTaskRouter:
             'complex', 'advanced', 'sophisticated', 'comprehensive', 'multi-step',
             'large-scale', 'enterprise', 'distributed', 'optimization', 'algorithm'
         ]
-        complexity_score += min(0.3, len([kw for kw in complex_keywords if kw in description.lower()]) * 0.1)
+        description_lower = description.lower()
+        complexity_score += min(0.3, sum(1 for kw in complex_keywords if kw in description_lower) * 0.1)
         
         # File count and types
         if files:
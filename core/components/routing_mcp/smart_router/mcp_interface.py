@@ -6,6 +6,7 @@ PowerAutomation 4.0 Smart Router MCP Interface
 import asyncio
 import json
 import logging
+import threading
 from typing import Dict, List, Any, Optional, Callable
 from dataclasses import dataclass, asdict
 from datetime import datetime
@@ -52,6 +53,7 @@ class SmartRouterMCPInterface:
         self.is_initialized = False
         self.session_id = str(uuid.uuid4())
         self.capabilities = self._define_capabilities()
+        self._capability_dicts = None  # asdict(capabilities)缓存，能力定义在初始化后不变
         
         # 消息处理器
         self.message_handlers: Dict[str, Callable] = {
@@ -104,6 +106,16 @@ class SmartRouterMCPInterface:
             )
         ]
     
+    def _get_capability_dicts(self) -> List[Dict[str, Any]]:
+        """获取能力描述的字典形式，首次调用时序列化并缓存，每次返回副本"""
+        if self._capability_dicts is None:
+            self._capability_dicts = tuple(asdict(cap) for cap in self.capabilities)
+        # 返回副本，避免调用方修改结果时污染缓存
+        return [
+            {**cap_dict, "methods": list(cap_dict["methods"])}
+            for cap_dict in self._capability_dicts
+        ]
+    
     async def initialize(self) -> bool:
         """初始化MCP接口"""
         try:
@@ -194,7 +206,7 @@ class SmartRouterMCPInterface:
         return {
             "success": success,
             "session_id": self.session_id,
-            "capabilities": [asdict(cap) for cap in self.capabilities],
+            "capabilities": self._get_capability_dicts(),
             "version": "4.0.0"
         }
     
@@ -223,7 +235,7 @@ class SmartRouterMCPInterface:
             
             return {
                 "success": True,
-                "route_result": asdict(route_result),
+                "route_result": route_result.to_dict(),
                 "request_id": route_request.request_id
             }
             
@@ -302,7 +314,7 @@ class SmartRouterMCPInterface:
     async def _handle_get_capabilities(self, params: Dict[str, Any]) -> Dict[str, Any]:
         """处理获取能力请求"""
         return {
-            "capabilities": [asdict(cap) for cap in self.capabilities],
+            "capabilities": self._get_capability_dicts(),
             "session_id": self.session_id,
             "version": "4.0.0"
         }
@@ -380,7 +392,7 @@ class SmartRouterMCPInterface:
             "name": "SmartRouterMCP",
             "version": "4.0.0",
             "description": "智慧路由MCP - 负责智能路由、语义分析和任务分发",
-            "capabilities": [asdict(cap) for cap in self.capabilities],
+            "capabilities": self._get_capability_dicts(),
             "session_id": self.session_id,
             "is_initialized": self.is_initialized,
             "stats": self.stats
@@ -389,12 +401,23 @@ class SmartRouterMCPInterface:
 
 # 全局智慧路由MCP接口实例
 _smart_router_mcp = None
+_smart_router_mcp_lock = threading.Lock()
 
 
 def get_smart_router_mcp() -> SmartRouterMCPInterface:
     """获取全局智慧路由MCP接口实例"""
     global _smart_router_mcp
     if _smart_router_mcp is None:
-        _smart_router_mcp = SmartRouterMCPInterface()
+        # 双重检查：并发的首次调用只创建一个实例
+        with _smart_router_mcp_lock:
+            if _smart_router_mcp is None:
+                _smart_router_mcp = SmartRouterMCPInterface()
     return _smart_router_mcp
 
+
+def reset_smart_router_mcp():
+    """重置全局智慧路由MCP接口实例（供测试使用）"""
+    global _smart_router_mcp
+    with _smart_router_mcp_lock:
+        _smart_router_mcp = None
+
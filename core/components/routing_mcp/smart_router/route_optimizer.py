@@ -224,10 +224,15 @@ class RouteOptimizer:
         if not semantic_result:
             return route
         
+        # 所需能力只取决于意图，对所有候选智能体只计算一次
+        required_capabilities = set(self._get_required_capabilities(semantic_result.intent))
+        
         # 计算每个智能体的适配分数
         agent_scores = []
         for agent in available_agents:
-            score = self._calculate_agent_score(agent, semantic_result, route['request'])
+            score = self._calculate_agent_score(
+                agent, semantic_result, route['request'], required_capabilities
+            )
             agent_scores.append((agent, score))
         
         # 选择最高分的智能体
@@ -328,17 +333,18 @@ class RouteOptimizer:
         self,
         agent: Dict[str, Any],
         semantic_result: SemanticResult,
-        request: Dict[str, Any]
+        request: Dict[str, Any],
+        required_capabilities: Optional[set] = None
     ) -> float:
-        """计算智能体适配分数"""
+        """计算智能体适配分数（required_capabilities 可由调用方预先计算传入）"""
         score = 0.0
         
         # 能力匹配分数
-        agent_capabilities = set(agent.get('capabilities', []))
-        required_capabilities = set(self._get_required_capabilities(semantic_result.intent))
+        if required_capabilities is None:
+            required_capabilities = set(self._get_required_capabilities(semantic_result.intent))
         
         if required_capabilities:
-            capability_match = len(agent_capabilities & required_capabilities) / len(required_capabilities)
+            capability_match = len(required_capabilities.intersection(agent.get('capabilities', []))) / len(required_capabilities)
             score += capability_match * 0.4
         
         # 历史性能分数
@@ -444,17 +450,17 @@ class RouteOptimizer:
         import hashlib
         import json
         
-        # 创建请求的标准化表示
+        # 创建请求的标准化表示（非安全用途，用blake2b代替md5，摘要长度与原来一致）
         normalized_request = {
             'type': request.get('type', ''),
             'complexity': request.get('complexity', 'medium'),
-            'description_hash': hashlib.md5(
-                request.get('description', '').encode()
-            ).hexdigest()[:8]
+            'description_hash': hashlib.blake2b(
+                request.get('description', '').encode(), digest_size=4
+            ).hexdigest()
         }
         
         cache_string = json.dumps(normalized_request, sort_keys=True)
-        return hashlib.md5(cache_string.encode()).hexdigest()
+        return hashlib.blake2b(cache_string.encode(), digest_size=16).hexdigest()
     
     def _update_stats(self, result: OptimizationResult):
         """更新统计信息"""
@@ -10,6 +10,16 @@ from dataclasses import dataclass
 from enum import Enum
 
 
+# 关键词提取用的单词模式和停用词，模块加载时构建一次
+_WORD_RE = re.compile(r'\b[a-zA-Z]+\b')
+_STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
+    'should', 'may', 'might', 'can', 'this', 'that', 'these', 'those'
+})
+
+
 class IntentType(Enum):
     """意图类型枚举"""
     ARCHITECT = "architect"
@@ -39,6 +49,16 @@ class SemanticAnalyzer:
         self.intent_patterns = self._load_intent_patterns()
         self.entity_extractors = self._load_entity_extractors()
         
+        # 预编译模式，避免每次分析都查找正则缓存
+        self._compiled_intent_patterns = {
+            intent_type: [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+            for intent_type, patterns in self.intent_patterns.items()
+        }
+        self._compiled_entity_extractors = {
+            entity_name: re.compile(pattern, re.IGNORECASE)
+            for entity_name, pattern in self.entity_extractors.items()
+        }
+        
     def _load_intent_patterns(self) -> Dict[IntentType, List[str]]:
         """加载意图识别模式"""
         return {
@@ -118,12 +138,12 @@ class SemanticAnalyzer:
         """识别意图"""
         intent_scores = {}
         
-        for intent_type, patterns in self.intent_patterns.items():
+        for intent_type, patterns in self._compiled_intent_patterns.items():
             score = 0.0
             matches = 0
             
             for pattern in patterns:
-                if re.search(pattern, text, re.IGNORECASE):
+                if pattern.search(text):
                     matches += 1
                     score += 1.0 / len(patterns)
             
@@ -141,38 +161,27 @@ class SemanticAnalyzer:
         """提取实体"""
         entities = {}
         
-        for entity_name, pattern in self.entity_extractors.items():
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for entity_name, pattern in self._compiled_entity_extractors.items():
+            matches = pattern.findall(text)
             if matches:
                 entities[entity_name] = matches[0] if len(matches) == 1 else matches
         
         return entities
     
-    def _extract_keywords(self, text: str) -> List[str]:
-        """提取关键词"""
-        # 简单的关键词提取，去除停用词
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-            'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-            'should', 'may', 'might', 'can', 'this', 'that', 'these', 'those'
-        }
-        
-        # 提取单词
-        words = re.findall(r'\b[a-zA-Z]+\b', text.lower())
-        
-        # 过滤停用词和短词
-        keywords = [word for word in words if len(word) > 2 and word not in stop_words]
-        
-        # 去重并保持顺序
+    def _extract_keywords(self, text_lower: str) -> List[str]:
+        """提取关键词（text_lower 需已小写）"""
+        # 简单的关键词提取，去除停用词和短词，去重并保持顺序
         seen = set()
         unique_keywords = []
-        for keyword in keywords:
-            if keyword not in seen:
-                seen.add(keyword)
-                unique_keywords.append(keyword)
-        
-        return unique_keywords[:10]  # 最多返回10个关键词
+        for match in _WORD_RE.finditer(text_lower):
+            word = match.group()
+            if len(word) > 2 and word not in _STOP_WORDS and word not in seen:
+                seen.add(word)
+                unique_keywords.append(word)
+                if len(unique_keywords) == 10:  # 最多返回10个关键词
+                    break
+        
+        return unique_keywords
     
     def _process_context(self, context: Dict[str, Any]) -> Dict[str, Any]:
         """处理上下文信息"""
@@ -8,6 +8,7 @@ import json
 import logging
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
+from collections import OrderedDict
 from enum import Enum
 import time
 from datetime import datetime
@@ -51,6 +52,17 @@ class RouteResult:
     reasoning: str
     estimated_time: int
     alternative_routes: List[Dict[str, Any]] = None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典格式（备选路由每次决策新建，无需深拷贝）"""
+        return {
+            "target_agent": self.target_agent,
+            "target_mcp": self.target_mcp,
+            "confidence": self.confidence,
+            "reasoning": self.reasoning,
+            "estimated_time": self.estimated_time,
+            "alternative_routes": self.alternative_routes
+        }
 
 class SmartRouter:
     """智慧路由器 - 核心路由决策引擎"""
@@ -78,6 +90,21 @@ class SmartRouter:
         self.route_history = []
         self.performance_metrics = {}
         
+        # 语义分析结果缓存（LRU），相同内容的请求直接复用分析结果
+        self.semantic_cache_size = self.config.semantic_cache_size
+        self._semantic_cache = OrderedDict()
+        
+        # 语义分析用的关键词表，初始化时加载一次
+        self.tech_keywords = self._load_tech_keywords()
+        self.intent_patterns = self._load_intent_patterns()
+        self.domain_keywords = self._load_domain_keywords()
+        
+        # 智能体能力表打包为元组，匹配时按位置解包，避免每次请求重建嵌套字典
+        self.agent_profiles = tuple(
+            (agent_name, info["intents"], info["domains"], info["capabilities"], info["load"], info["performance"])
+            for agent_name, info in self._load_agent_capabilities().items()
+        )
+        
         self.logger.info("SmartRouter 4.0 初始化完成")
     
     async def initialize(self):
@@ -114,7 +141,7 @@ class SmartRouter:
         self.route_stats["total_requests"] += 1
         
         try:
-            self.logger.info(f"开始路由请求: {request.request_id}")
+            self.logger.info("开始路由请求: %s", request.request_id)
             
             # 语义分析
             semantic_analysis = await self._analyze_semantics(request)
@@ -137,7 +164,7 @@ class SmartRouter:
             self.route_stats["successful_routes"] += 1
             self._update_performance_stats(time.time() - start_time)
             
-            self.logger.info(f"路由成功: {request.request_id} -> {route_result.target_agent}")
+            self.logger.info("路由成功: %s -> %s", request.request_id, route_result.target_agent)
             return route_result
             
         except Exception as e:
@@ -155,20 +182,28 @@ class SmartRouter:
     
     async def _analyze_semantics(self, request: RouteRequest) -> Dict[str, Any]:
         """语义分析"""
+        cached = self._semantic_cache.get(request.content)
+        if cached is not None:
+            self._semantic_cache.move_to_end(request.content)
+            return {**cached, "keywords": list(cached["keywords"])}
+        
         try:
+            # 统一小写一次，供下游匹配复用
+            content_lower = request.content.lower()
+            
             # 关键词提取
-            keywords = await self._extract_keywords(request.content)
+            keywords = await self._extract_keywords(content_lower)
             
             # 意图识别
-            intent = await self._identify_intent(request.content, keywords)
+            intent = await self._identify_intent(content_lower, keywords)
             
             # 复杂度评估
             complexity = await self._assess_complexity(request.content, intent)
             
             # 领域分类
-            domain = await self._classify_domain(request.content, intent)
+            domain = await self._classify_domain(content_lower, intent)
             
-            return {
+            analysis = {
                 "keywords": keywords,
                 "intent": intent,
                 "complexity": complexity,
@@ -176,6 +211,13 @@ class SmartRouter:
                 "confidence": 0.85
             }
             
+            # 缓存副本，避免调用方修改影响后续命中
+            self._semantic_cache[request.content] = {**analysis, "keywords": list(keywords)}
+            if len(self._semantic_cache) > self.semantic_cache_size:
+                self._semantic_cache.popitem(last=False)
+            
+            return analysis
+            
         except Exception as e:
             self.logger.error(f"语义分析失败: {e}")
             return {
@@ -186,31 +228,17 @@ class SmartRouter:
                 "confidence": 0.1
             }
     
-    async def _extract_keywords(self, content: str) -> List[str]:
-        """提取关键词"""
-        # 简化的关键词提取逻辑
-        keywords = []
-        
-        # 技术关键词
-        tech_keywords = [
+    def _load_tech_keywords(self) -> List[str]:
+        """加载技术关键词"""
+        return [
             "architect", "design", "develop", "test", "deploy", "monitor",
             "api", "database", "frontend", "backend", "microservice",
             "docker", "kubernetes", "ci/cd", "security", "performance"
         ]
-        
-        content_lower = content.lower()
-        for keyword in tech_keywords:
-            if keyword in content_lower:
-                keywords.append(keyword)
-        
-        return keywords
     
-    async def _identify_intent(self, content: str, keywords: List[str]) -> str:
-        """识别意图"""
-        content_lower = content.lower()
-        
-        # 意图映射
-        intent_patterns = {
+    def _load_intent_patterns(self) -> Dict[str, List[str]]:
+        """加载意图映射"""
+        return {
             "architecture": ["architect", "design", "structure", "pattern"],
             "development": ["develop", "code", "implement", "build"],
             "testing": ["test", "verify", "validate", "check"],
@@ -219,30 +247,10 @@ class SmartRouter:
             "security": ["security", "secure", "protect", "vulnerability"],
             "performance": ["performance", "optimize", "speed", "efficiency"]
         }
-        
-        for intent, patterns in intent_patterns.items():
-            if any(pattern in content_lower for pattern in patterns):
-                return intent
-        
-        return "general"
-    
-    async def _assess_complexity(self, content: str, intent: str) -> str:
-        """评估复杂度"""
-        # 基于内容长度和关键词密度评估复杂度
-        content_length = len(content)
-        
-        if content_length < 50:
-            return "low"
-        elif content_length < 200:
-            return "medium"
-        else:
-            return "high"
     
-    async def _classify_domain(self, content: str, intent: str) -> str:
-        """领域分类"""
-        content_lower = content.lower()
-        
-        domain_keywords = {
+    def _load_domain_keywords(self) -> Dict[str, List[str]]:
+        """加载领域关键词"""
+        return {
             "web": ["web", "frontend", "backend", "html", "css", "javascript"],
             "mobile": ["mobile", "ios", "android", "app", "react native"],
             "data": ["data", "database", "sql", "analytics", "ml", "ai"],
@@ -250,23 +258,10 @@ class SmartRouter:
             "security": ["security", "auth", "encryption", "vulnerability"],
             "api": ["api", "rest", "graphql", "microservice", "service"]
         }
-        
-        for domain, keywords in domain_keywords.items():
-            if any(keyword in content_lower for keyword in keywords):
-                return domain
-        
-        return "general"
     
-    async def _match_capabilities(self, request: RouteRequest, semantic_analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """能力匹配"""
-        matches = []
-        
-        # 基于意图匹配智能体
-        intent = semantic_analysis.get("intent", "general")
-        domain = semantic_analysis.get("domain", "general")
-        
-        # 智能体能力映射
-        agent_capabilities = {
+    def _load_agent_capabilities(self) -> Dict[str, Dict[str, Any]]:
+        """加载智能体能力映射"""
+        return {
             "architect_agent": {
                 "intents": ["architecture", "design"],
                 "domains": ["web", "mobile", "api", "general"],
@@ -310,23 +305,64 @@ class SmartRouter:
                 "performance": 0.87
             }
         }
+    
+    async def _extract_keywords(self, content_lower: str) -> List[str]:
+        """提取关键词（content_lower 需已小写）"""
+        # 简化的关键词提取逻辑：匹配技术关键词
+        return [keyword for keyword in self.tech_keywords if keyword in content_lower]
+    
+    async def _identify_intent(self, content_lower: str, keywords: List[str]) -> str:
+        """识别意图（content_lower 需已小写）"""
+        for intent, patterns in self.intent_patterns.items():
+            if any(pattern in content_lower for pattern in patterns):
+                return intent
+        
+        return "general"
+    
+    async def _assess_complexity(self, content: str, intent: str) -> str:
+        """评估复杂度"""
+        # 基于内容长度和关键词密度评估复杂度
+        content_length = len(content)
+        
+        if content_length < 50:
+            return "low"
+        elif content_length < 200:
+            return "medium"
+        else:
+            return "high"
+    
+    async def _classify_domain(self, content_lower: str, intent: str) -> str:
+        """领域分类（content_lower 需已小写）"""
+        for domain, keywords in self.domain_keywords.items():
+            if any(keyword in content_lower for keyword in keywords):
+                return domain
+        
+        return "general"
+    
+    async def _match_capabilities(self, request: RouteRequest, semantic_analysis: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """能力匹配"""
+        matches = []
+        
+        # 基于意图匹配智能体
+        intent = semantic_analysis.get("intent", "general")
+        domain = semantic_analysis.get("domain", "general")
         
-        for agent_name, capabilities in agent_capabilities.items():
+        for agent_name, intents, domains, agent_caps, load, performance in self.agent_profiles:
             # 计算匹配分数
-            intent_match = 1.0 if intent in capabilities["intents"] else 0.3
-            domain_match = 1.0 if domain in capabilities["domains"] else 0.5
+            intent_match = 1.0 if intent in intents else 0.3
+            domain_match = 1.0 if domain in domains else 0.5
             
             # 综合评分
-            match_score = (intent_match * 0.6 + domain_match * 0.4) * capabilities["performance"]
+            match_score = (intent_match * 0.6 + domain_match * 0.4) * performance
             
             if match_score > 0.5:  # 阈值过滤
                 matches.append({
                     "agent": agent_name,
                     "mcp": "agent_squad",
                     "score": match_score,
-                    "load": capabilities["load"],
-                    "capabilities": capabilities["capabilities"],
-                    "estimated_time": int(30 / capabilities["performance"])
+                    "load": load,
+                    "capabilities": list(agent_caps),  # 复制，避免调用方修改共享表
+                    "estimated_time": int(30 / performance)
                 })
         
         # 按分数排序
@@ -78,6 +78,7 @@ class PowerAutomationConfig(BaseSettings):
     semantic_analysis: bool = Field(default=True, env="SEMANTIC_ANALYSIS")
     confidence_threshold: float = Field(default=0.7, env="CONFIDENCE_THRESHOLD")
     max_routing_attempts: int = Field(default=3, env="MAX_ROUTING_ATTEMPTS")
+    semantic_cache_size: int = Field(default=256, env="SEMANTIC_CACHE_SIZE")
     
     @validator('log_level')
     def validate_log_level(cls, v):
@@ -5,6 +5,8 @@ PowerAutomation 4.0 Logging Configuration
 
 import os
 import sys
+import atexit
+import queue
 import logging
 import logging.handlers
 import json
@@ -80,6 +82,7 @@ class PowerAutomationLogger:
         self.name = name
         self.config = config or self._get_default_config()
         self.logger = logging.getLogger(name)
+        self._queue_listener = None
         self._setup_logger()
     
     def _get_default_config(self) -> Dict[str, Any]:
@@ -92,12 +95,14 @@ class PowerAutomationLogger:
             'backup_count': app_config.log_backup_count,
             'format': 'structured',  # 'structured', 'json', 'simple'
             'console': True,
-            'file_enabled': True
+            'file_enabled': True,
+            'queue_enabled': False  # 通过后台线程写日志，避免阻塞事件循环
         }
     
     def _setup_logger(self):
         """设置日志器"""
         # 清除现有处理器
+        self._stop_queue_listener()
         self.logger.handlers.clear()
         
         # 设置日志级别
@@ -114,6 +119,32 @@ class PowerAutomationLogger:
         # 添加文件处理器
         if self.config.get('file_enabled', True):
             self._add_file_handler()
+        
+        # 队列模式：调用线程只入队，实际输出由后台监听线程完成
+        if self.config.get('queue_enabled', False) and self.logger.handlers:
+            self._start_queue_listener()
+    
+    def _start_queue_listener(self):
+        """将已添加的处理器移交给后台队列监听器"""
+        handlers = list(self.logger.handlers)
+        self.logger.handlers.clear()
+        
+        log_queue = queue.Queue(-1)
+        self._queue_listener = logging.handlers.QueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        self._queue_listener.start()
+        self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        
+        # 进程退出前刷新队列中剩余的日志（仅在监听器运行期间注册）
+        atexit.register(self._stop_queue_listener)
+    
+    def _stop_queue_listener(self):
+        """停止后台队列监听器"""
+        if self._queue_listener is not None:
+            self._queue_listener.stop()
+            self._queue_listener = None
+            atexit.unregister(self._stop_queue_listener)
     
     def _add_console_handler(self):
         """添加控制台处理器"""
@@ -224,7 +255,8 @@ class LoggerManager:
                 'backup_count': app_config.log_backup_count,
                 'format': 'structured',
                 'console': True,
-                'file_enabled': True
+                'file_enabled': True,
+                'queue_enabled': False
             }
         except Exception:
             # 如果配置加载失败，使用硬编码默认值
@@ -235,7 +267,8 @@ class LoggerManager:
                 'backup_count': 5,
                 'format': 'structured',
                 'console': True,
-                'file_enabled': True
+                'file_enabled': True,
+                'queue_enabled': False
             }
     
     def get_logger(self, name: str, config: Optional[Dict[str, Any]] = None) -> PowerAutomationLogger:
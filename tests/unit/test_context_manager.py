@@ -0,0 +1,125 @@
+"""
+ContextManager 单元测试
+"""
+
+from dataclasses import asdict
+
+import pytest
+
+from core.components.memoryos_mcp.context_manager import ContextManager, ContextQuery, ContextType
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestContentTokens:
+    """上下文内容分词缓存测试类"""
+    
+    async def test_tokens_refresh_when_content_is_replaced(self, context_manager):
+        """测试替换内容后重新分词"""
+        context_id = await context_manager.create_context({'text': 'alpha beta gamma'}, ContextType.TASK)
+        context = context_manager.contexts[context_id]
+        
+        assert 'beta' in context_manager._get_content_tokens(context)[1]
+        
+        context.content = {'text': 'delta epsilon zeta'}
+        
+        _, words = context_manager._get_content_tokens(context)
+        assert 'epsilon' in words and 'beta' not in words
+    
+    async def test_caller_dict_changes_do_not_leak(self, context_manager):
+        """测试创建后修改调用方的字典不影响上下文内容与分词"""
+        content = {'text': 'alpha beta gamma'}
+        context_id = await context_manager.create_context(content, ContextType.TASK)
+        context = context_manager.contexts[context_id]
+        context_manager._get_content_tokens(context)
+        
+        content['text'] = 'delta epsilon zeta'
+        
+        assert context.content == {'text': 'alpha beta gamma'}
+        assert 'beta' in context_manager._get_content_tokens(context)[1]
+    
+    async def test_cached_tokens_are_not_a_field(self, context_manager):
+        """测试缓存的分词不属于数据类字段"""
+        context_id = await context_manager.create_context({'text': 'alpha'}, ContextType.TASK)
+        context = context_manager.contexts[context_id]
+        context_manager._get_content_tokens(context)
+        
+        assert '_content_tokens' not in asdict(context)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestScopedSearch:
+    """按用户/会话限定范围的搜索测试类"""
+    
+    async def test_scoped_candidates_match_full_scan(self, context_manager):
+        """测试按 user_id/session_id 取候选与全量扫描后过滤的结果一致"""
+        owners = {}
+        for i, (user_id, session_id) in enumerate(
+            [('u1', 's1'), ('u1', 's2'), ('u2', 's1'), ('u2', 's2'), ('u1', 's1'), (None, None)] * 3
+        ):
+            context_type = ContextType.TASK if i % 2 else ContextType.PROJECT
+            context_id = await context_manager.create_context(
+                {'text': f'context {i}'}, context_type, user_id=user_id, session_id=session_id
+            )
+            owners[context_id] = (user_id, session_id)
+        
+        for user_id in [None, 'u1', 'u2', 'u3']:
+            for session_id in [None, 's1', 's2']:
+                for context_types in [None, [ContextType.TASK]]:
+                    query = ContextQuery(user_id=user_id, session_id=session_id, context_types=context_types)
+                    
+                    expected = {
+                        context_id for context_id, context in context_manager.contexts.items()
+                        if (user_id is None or context.metadata.get('user_id') == user_id)
+                        and (session_id is None or context.metadata.get('session_id') == session_id)
+                        and (context_types is None or context.context_type in context_types)
+                    }
+                    candidates = {
+                        context.context_id for context in context_manager._get_candidate_contexts(query)
+                    }
+                    assert candidates == expected
+    
+    async def test_search_returns_only_scoped_contexts(self, context_manager):
+        """测试限定范围的搜索不会返回其他用户的上下文"""
+        own_id = await context_manager.create_context(
+            {'text': 'shared topic'}, ContextType.TASK, user_id='u1', session_id='s1'
+        )
+        await context_manager.create_context(
+            {'text': 'shared topic'}, ContextType.TASK, user_id='u2', session_id='s1'
+        )
+        
+        results = await context_manager.search_contexts(
+            ContextQuery(query_text='shared', user_id='u1', relevance_threshold=0.0)
+        )
+        
+        assert [context.context_id for context in results] == [own_id]
+
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestSwitchHistory:
+    """上下文切换历史测试类"""
+    
+    async def test_history_is_bounded_per_session(self):
+        """测试每个用户/会话的切换历史只保留最近 max_switch_history 条"""
+        manager = ContextManager({'max_switch_history': 3})
+        context_ids = [
+            await manager.create_context({'text': f'task {i}'}, ContextType.TASK, user_id='u1', session_id='s1')
+            for i in range(6)
+        ]
+        
+        for context_id in context_ids:
+            assert await manager.switch_context('u1', 's1', context_id)
+        assert await manager.switch_context('u1', 's2', context_ids[0])
+        
+        history = manager.switch_history['u1:s1']
+        assert [event.to_context for event in history] == context_ids[-3:]
+        assert len(manager.switch_history['u1:s2']) == 1
+        
+        # 历史被截断后转移统计仍覆盖全部切换
+        assert manager.context_stats['context_switches'] == 7
+        assert sum(manager.context_transition_totals.values()) == sum(
+            sum(targets.values()) for targets in manager.context_transitions.values()
+        ) == 5
@@ -0,0 +1,475 @@
+"""
+MemoryEngine 单元测试
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from core.components.memoryos_mcp.memory_engine import (
+    MemoryEngine, MemoryPriority, MemoryQuery, MemoryStatus, MemoryType
+)
+
+
+def _read_access_count(engine, memory_id):
+    conn = sqlite3.connect(engine.memory_db_path)
+    try:
+        row = conn.execute(
+            'SELECT access_count FROM memories WHERE memory_id = ?', (memory_id,)
+        ).fetchone()
+        return row[0] if row else None
+    finally:
+        conn.close()
+
+
+def _baseline_text_similarity(memory, query_text):
+    """基线实现：逐条记忆重新分词计算文本相似度"""
+    query_words = set(query_text.lower().split())
+    memory_words = set(json.dumps(memory.content).lower().split())
+    if not query_words:
+        return 0.0
+    return len(query_words & memory_words) / len(query_words)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestInitialization:
+    """数据库初始化测试类"""
+    
+    async def test_initialize_loads_existing_memories(self, tmp_path):
+        """测试 initialize() 等待数据库初始化并加载已有记忆"""
+        config = {'memory_db_path': str(tmp_path / 'memory.db'), 'enable_embeddings': False}
+        engine = MemoryEngine(config)
+        engine._calculate_importance_score = lambda content, memory_type, priority: 0.5
+        memory_id = await engine.store_memory({'text': 'alpha'}, MemoryType.EPISODIC)
+        await engine.close()
+        
+        reopened = MemoryEngine(config)
+        try:
+            await reopened.initialize()
+            assert memory_id in reopened.memories
+        finally:
+            await reopened.close()
+    
+    async def test_initialize_raises_database_errors(self, tmp_path):
+        """测试数据库初始化失败时 initialize() 抛出该错误"""
+        # 以目录作为数据库路径，无法打开
+        engine = MemoryEngine({'memory_db_path': str(tmp_path)})
+        try:
+            with pytest.raises(sqlite3.OperationalError):
+                await engine.initialize()
+        finally:
+            await engine.close()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestAccessWriteBehind:
+    """访问统计延迟写入测试类"""
+    
+    async def test_flush_writes_queued_access_stats(self, memory_engine):
+        """测试 flush_access_stats() 后排队的访问统计已写入数据库"""
+        memory_id = await memory_engine.store_memory({'text': 'alpha'}, MemoryType.EPISODIC)
+        for _ in range(3):
+            await memory_engine.retrieve_memory(memory_id)
+        
+        await memory_engine.flush_access_stats()
+        
+        assert memory_engine._access_write_queue.empty()
+        assert _read_access_count(memory_engine, memory_id) == memory_engine.memories[memory_id].access_count == 4
+    
+    async def test_close_drains_queue_and_cancels_writer(self, memory_engine):
+        """测试 close() 写入排队的访问统计并停止后台写入任务"""
+        memory_id = await memory_engine.store_memory({'text': 'alpha'}, MemoryType.EPISODIC)
+        await memory_engine.retrieve_memory(memory_id)
+        
+        await memory_engine.close()
+        
+        assert memory_engine._access_writer_task.cancelled()
+        assert memory_engine._access_write_queue.empty()
+        assert _read_access_count(memory_engine, memory_id) == 2
+        
+        # 关闭后的访问统计由下一次 flush_access_stats() 直接写入
+        await memory_engine.retrieve_memory(memory_id)
+        await memory_engine.flush_access_stats()
+        assert _read_access_count(memory_engine, memory_id) == 3
+    
+    async def test_access_during_pending_insert_is_not_lost(self, memory_engine):
+        """测试记忆插入尚未完成时的访问统计不会丢失"""
+        released = threading.Event()
+        write_memory_rows = memory_engine._write_memory_rows
+        
+        def blocked_write_memory_rows(rows):
+            released.wait(5)
+            write_memory_rows(rows)
+        
+        memory_engine._write_memory_rows = blocked_write_memory_rows
+        store_task = asyncio.create_task(
+            memory_engine.store_memory({'text': 'alpha'}, MemoryType.EPISODIC)
+        )
+        while not memory_engine.memories:
+            await asyncio.sleep(0.01)
+        memory_id = next(iter(memory_engine.memories))
+        
+        # 访问统计的 UPDATE 先于 INSERT 执行，此时没有匹配的行
+        await memory_engine.retrieve_memory(memory_id)
+        await memory_engine.flush_access_stats()
+        
+        released.set()
+        await store_task
+        await memory_engine.flush_access_stats()
+        
+        assert _read_access_count(memory_engine, memory_id) == memory_engine.memories[memory_id].access_count == 2
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestSearchTiers:
+    """搜索冷热分层测试类"""
+    
+    async def _store_pair(self, engine):
+        hot_id = await engine.store_memory({'text': 'hot'}, MemoryType.EPISODIC, tags=['tier'])
+        cold_id = await engine.store_memory({'text': 'cold'}, MemoryType.EPISODIC, tags=['tier'])
+        hot, cold = engine.memories[hot_id], engine.memories[cold_id]
+        cold.status = MemoryStatus.ARCHIVED
+        cold.created_at = hot.created_at
+        return hot, cold
+    
+    async def test_higher_scoring_cold_memory_is_returned(self, memory_engine):
+        """测试得分更高的归档记忆不会被活跃记忆挤掉"""
+        hot, cold = await self._store_pair(memory_engine)
+        hot.importance_score, cold.importance_score = 0.0, 1.0
+        
+        result = await memory_engine.search_memories(
+            MemoryQuery(tags=['tier'], limit=1, similarity_threshold=0.0)
+        )
+        
+        assert [memory.memory_id for memory in result.memories] == [cold.memory_id]
+        assert result.total_count == result.query_metadata['filtered_count'] == 2
+    
+    async def test_ties_prefer_active_memory(self, memory_engine):
+        """测试得分相同时优先返回活跃记忆"""
+        hot, cold = await self._store_pair(memory_engine)
+        hot.importance_score = cold.importance_score = 0.5
+        
+        result = await memory_engine.search_memories(
+            MemoryQuery(tags=['tier'], limit=1, similarity_threshold=0.0)
+        )
+        
+        assert [memory.memory_id for memory in result.memories] == [hot.memory_id]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestEmbeddingIndex:
+    """嵌入矩阵索引测试类"""
+    
+    async def test_swap_remove_keeps_index_consistent(self, memory_engine):
+        """测试删除记忆（末行移入空位）后行号映射与矩阵内容保持一致"""
+        memory_engine.enable_embeddings = True
+        memory_engine._generate_embedding = lambda content: content['vector']
+        rng = np.random.default_rng(0)
+        
+        memory_ids = []
+        for i in range(12):
+            vector = rng.normal(size=8).tolist()
+            memory_ids.append(await memory_engine.store_memory({'vector': vector}, MemoryType.SEMANTIC))
+        
+        # 删除首行、末行、中间行以及刚被移动过的行
+        for index in (0, 11, 5, 10, 1):
+            await memory_engine.delete_memory(memory_ids[index])
+        remaining = [memory_id for i, memory_id in enumerate(memory_ids) if i not in (0, 11, 5, 10, 1)]
+        
+        ids = memory_engine._embedding_ids
+        assert sorted(ids) == sorted(remaining)
+        assert memory_engine._embedding_rows == {memory_id: row for row, memory_id in enumerate(ids)}
+        for row, memory_id in enumerate(ids):
+            vector = np.asarray(memory_engine.memories[memory_id].embedding, dtype=np.float32)
+            np.testing.assert_allclose(
+                memory_engine._embedding_matrix[row], vector / np.linalg.norm(vector), rtol=1e-5
+            )
+        
+        # 每个剩余记忆的嵌入仍能找到它自己
+        for memory_id in remaining:
+            similar = memory_engine._find_similar_memories(
+                memory_engine.memories[memory_id].embedding, max_results=1
+            )
+            assert [memory.memory_id for memory in similar] == [memory_id]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestTopK:
+    """top-k 选择测试类"""
+    
+    @pytest.mark.parametrize("k", [-1, 0, 1, 3, 7, 19, 20, 25])
+    async def test_top_k_matches_stable_argsort(self, memory_engine, k):
+        """测试 _top_k 与完整稳定排序的结果一致（含并列值、k ≥ n 与 k ≤ 0）"""
+        rng = np.random.default_rng(k + 1)
+        # 取值很少，保证在第 k 名处存在并列
+        values = rng.integers(0, 4, size=30).astype(np.float64)
+        indices = np.sort(rng.choice(30, size=20, replace=False))
+        
+        expected = indices[np.argsort(-values[indices], kind='stable')][:max(k, 0)]
+        
+        np.testing.assert_array_equal(memory_engine._top_k(indices, values, k), expected)
+    
+    async def test_top_k_empty_indices(self, memory_engine):
+        """测试没有候选时返回空结果"""
+        result = memory_engine._top_k(np.array([], dtype=np.int64), np.array([1.0, 2.0]), 3)
+        
+        assert len(result) == 0
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestTextScores:
+    """倒排词索引文本评分测试类"""
+    
+    async def test_index_scores_match_baseline(self, memory_engine):
+        """测试倒排索引得到的文本分数与基线逐条计算一致"""
+        contents = [
+            {'text': 'alpha beta gamma'},
+            {'text': 'Alpha BETA', 'note': 'delta'},
+            {'text': 'gamma gamma epsilon'},
+            {'title': 'beta', 'body': 'zeta eta theta'},
+            {'text': ''},
+        ]
+        memory_ids = [
+            await memory_engine.store_memory(content, MemoryType.SEMANTIC) for content in contents
+        ]
+        # 内容更新与删除后索引需保持同步
+        await memory_engine.update_memory(memory_ids[2], {'content': {'text': 'eta beta'}})
+        await memory_engine.delete_memory(memory_ids[4])
+        memories = list(memory_engine.memories.values())
+        
+        for query_text in ['alpha', 'beta gamma', 'ALPHA beta beta', 'eta', '"beta"', 'missing words', '   ']:
+            scores = memory_engine._get_text_scores(memories, query_text)
+            expected = [_baseline_text_similarity(memory, query_text) for memory in memories]
+            np.testing.assert_allclose(scores, expected)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestWorkingMemoryEviction:
+    """工作记忆淘汰测试类"""
+    
+    async def test_eviction_matches_baseline(self, memory_engine):
+        """测试惰性最小堆淘汰的工作记忆与基线（按最近访问时间排序）一致"""
+        memory_engine.max_working_memory = 3
+        stored = []
+        
+        for i in range(10):
+            previous = dict(memory_engine.working_memory)
+            memory_id = await memory_engine.store_memory({'text': f'task {i}'}, MemoryType.WORKING)
+            stored.append(memory_id)
+            
+            # 基线：按 last_accessed 排序后保留最近访问的 max_working_memory 条
+            previous[memory_id] = memory_engine.memories[memory_id]
+            kept = sorted(previous.items(), key=lambda item: item[1].last_accessed)[-3:]
+            assert set(memory_engine.working_memory) == {memory_id for memory_id, _ in kept}
+            
+            # 访问较早的工作记忆，使其堆中的键过期
+            if i % 3 == 1:
+                await memory_engine.retrieve_memory(min(
+                    memory_engine.working_memory,
+                    key=lambda memory_id: memory_engine.working_memory[memory_id].last_accessed
+                ))
+        
+        for memory_id in stored:
+            memory = memory_engine.memories[memory_id]
+            if memory_id in memory_engine.working_memory:
+                assert memory.memory_type == MemoryType.WORKING
+            else:
+                assert memory.memory_type == MemoryType.EPISODIC
+                assert memory.priority == MemoryPriority.LOW
+                assert memory_id in memory_engine.priority_index[MemoryPriority.LOW]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestAssociations:
+    """标签关联测试类"""
+    
+    def _baseline_candidates(self, engine, memory):
+        """基线：与该记忆共享任一标签的全部记忆"""
+        return {
+            memory_id 
+            for tag in memory.tags 
+            for memory_id in engine.tag_index.get(tag, ()) 
+            if memory_id != memory.memory_id
+        }
+    
+    async def test_picks_most_shared_tags_with_ties(self, memory_engine):
+        """测试关联优先选择共享标签最多的记忆，并列时仍在基线候选集内"""
+        tag_sets = [
+            ['a', 'b', 'c'],
+            ['a', 'b'], ['b', 'c'], ['a', 'c', 'x'],
+            ['a'], ['b'], ['c', 'y'], ['c'],
+            ['x'], ['y'],
+        ]
+        for i, tags in enumerate(tag_sets):
+            await memory_engine.store_memory({'text': f'candidate {i}'}, MemoryType.SEMANTIC, tags=tags)
+        
+        memory_id = await memory_engine.store_memory({'text': 'target'}, MemoryType.SEMANTIC, tags=['a', 'b', 'c'])
+        memory = memory_engine.memories[memory_id]
+        
+        candidates = self._baseline_candidates(memory_engine, memory)
+        shared = {
+            candidate_id: len(set(memory.tags) & set(memory_engine.memories[candidate_id].tags)) 
+            for candidate_id in candidates
+        }
+        picked = memory.associations
+        
+        assert len(picked) == len(set(picked)) == 5
+        assert set(picked) <= candidates
+        # 并列（共享 1 个标签）的记忆中任选其一，但不会越过共享更多标签的记忆
+        assert min(shared[i] for i in picked) >= max(shared[i] for i in candidates - set(picked))
+        assert [shared[i] for i in picked] == sorted((shared[i] for i in picked), reverse=True)
+        for associated_id in picked:
+            assert memory_id in memory_engine.memories[associated_id].associations
+    
+    async def test_few_candidates_match_baseline(self, memory_engine):
+        """测试候选不足 5 个时关联集合与基线完全一致"""
+        for i, tags in enumerate([['a'], ['b', 'z'], ['z'], ['a', 'b']]):
+            await memory_engine.store_memory({'text': f'candidate {i}'}, MemoryType.SEMANTIC, tags=tags)
+        
+        memory_id = await memory_engine.store_memory({'text': 'target'}, MemoryType.SEMANTIC, tags=['a', 'b'])
+        memory = memory_engine.memories[memory_id]
+        
+        assert set(memory.associations) == self._baseline_candidates(memory_engine, memory)
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestArchiveAndExpiry:
+    """归档与过期清理测试类"""
+    
+    async def test_selection_matches_baseline(self, memory_engine):
+        """测试基于优先级索引的归档与过期选择与基线全量扫描一致"""
+        rng = np.random.default_rng(7)
+        priorities = list(MemoryPriority)
+        now = time.time()
+        
+        for i in range(60):
+            memory_id = await memory_engine.store_memory(
+                {'text': f'memory {i}'}, MemoryType.EPISODIC, 
+                priority=priorities[rng.integers(len(priorities))]
+            )
+            # 部分记忆通过 update_memory 修改优先级，优先级索引需随之更新
+            if i % 4 == 0:
+                await memory_engine.update_memory(
+                    memory_id, {'priority': priorities[rng.integers(len(priorities))]}
+                )
+            memory = memory_engine.memories[memory_id]
+            memory.created_at = now - float(rng.choice([10, 100, 400])) * 86400
+            memory.access_count = int(rng.integers(0, 5))
+            memory.importance_score = float(rng.choice([0.05, 0.5]))
+        
+        # 基线：对缓存中的全部记忆逐条判断
+        low_priorities = [MemoryPriority.LOW, MemoryPriority.ARCHIVE]
+        expected_archived = {
+            memory.memory_id for memory in memory_engine.memories.values()
+            if (now - memory.created_at) / 86400 > 90 
+            and memory.priority in low_priorities 
+            and memory.access_count < 3
+        }
+        expected_deleted = {
+            memory.memory_id for memory in memory_engine.memories.values()
+            if (now - memory.created_at) / 86400 > 365 
+            and memory.priority == MemoryPriority.ARCHIVE 
+            and memory.importance_score < 0.1
+        }
+        assert expected_archived and expected_deleted
+        
+        assert await memory_engine._archive_old_memories() == len(expected_archived)
+        archived = {
+            memory.memory_id for memory in memory_engine.memories.values() 
+            if memory.status == MemoryStatus.ARCHIVED
+        }
+        assert archived == expected_archived
+        
+        remaining = set(memory_engine.memories) - expected_deleted
+        assert await memory_engine._delete_expired_memories() == len(expected_deleted)
+        assert set(memory_engine.memories) == remaining
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+class TestDatabaseWrites:
+    """数据库写入测试类"""
+    
+    async def test_decay_matches_baseline_in_one_transaction(self, memory_engine):
+        """测试衰减结果与基线逐条计算一致，并在一个事务中写入数据库"""
+        rng = np.random.default_rng(3)
+        now = time.time()
+        for i in range(20):
+            memory_id = await memory_engine.store_memory({'text': f'memory {i}'}, MemoryType.EPISODIC)
+            memory = memory_engine.memories[memory_id]
+            memory.created_at = now - float(rng.uniform(0, 500)) * 86400
+            memory.last_accessed = now - float(rng.uniform(0, 60)) * 86400
+        await memory_engine.flush_access_stats()
+        
+        # 基线：按年龄与最近访问时间逐条计算衰减
+        expected = {}
+        for memory in memory_engine.memories.values():
+            age_decay = max(0.1, 1.0 - ((now - memory.created_at) / 86400 / 365))
+            access_decay = max(0.1, 1.0 - ((now - memory.last_accessed) / 86400 / 30))
+            decay_factor = (age_decay + access_decay) / 2
+            expected[memory.memory_id] = (decay_factor, memory.importance_score * decay_factor)
+        
+        write_calls = []
+        write_memory_rows = memory_engine._write_memory_rows
+        
+        def counting_write_memory_rows(rows):
+            write_calls.append(len(rows))
+            write_memory_rows(rows)
+        
+        memory_engine._write_memory_rows = counting_write_memory_rows
+        await memory_engine._apply_memory_decay()
+        
+        assert write_calls == [20]
+        conn = sqlite3.connect(memory_engine.memory_db_path)
+        try:
+            rows = dict(
+                (row[0], row[1:]) for row in 
+                conn.execute('SELECT memory_id, decay_factor, importance_score FROM memories')
+            )
+        finally:
+            conn.close()
+        for memory_id, (decay_factor, importance_score) in expected.items():
+            memory = memory_engine.memories[memory_id]
+            assert memory.decay_factor == pytest.approx(decay_factor, rel=1e-6)
+            assert memory.importance_score == pytest.approx(importance_score, rel=1e-6)
+            assert rows[memory_id] == (memory.decay_factor, memory.importance_score)
+    
+    async def test_concurrent_db_calls_are_bounded(self, tmp_path):
+        """测试并发数据库调用不超过 max_concurrent_db_ops"""
+        engine = MemoryEngine({
+            'memory_db_path': str(tmp_path / 'bounded.db'), 
+            'max_concurrent_db_ops': 3
+        })
+        lock = threading.Lock()
+        in_flight = [0, 0]  # 当前并发数、最大并发数
+        
+        def tracked_call(value):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight[1], in_flight[0])
+            time.sleep(0.01)
+            with lock:
+                in_flight[0] -= 1
+            return value
+        
+        try:
+            results = await asyncio.gather(*(engine._run_db(tracked_call, i) for i in range(40)))
+        finally:
+            await engine.close()
+        
+        assert results == list(range(40))
+        assert in_flight[1] == 3
@@ -0,0 +1,60 @@
+"""
+SmartRouterMCPInterface 单元测试
+"""
+
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from core.components.routing_mcp.smart_router import mcp_interface
+
+
+@pytest.mark.unit
+class TestGetSmartRouterMCP:
+    """全局智慧路由MCP接口实例测试类"""
+    
+    @pytest.fixture(autouse=True)
+    def slow_interface(self, monkeypatch):
+        """放慢实例创建，使并发的首次调用发生竞争"""
+        created = []
+        
+        def create_interface():
+            time.sleep(0.05)
+            created.append(object())
+            return created[-1]
+        
+        monkeypatch.setattr(mcp_interface, "SmartRouterMCPInterface", create_interface)
+        mcp_interface.reset_smart_router_mcp()
+        yield created
+        mcp_interface.reset_smart_router_mcp()
+    
+    def test_concurrent_first_calls_create_one_instance(self, slow_interface):
+        """测试并发的首次调用只创建一个实例"""
+        barrier = threading.Barrier(8)
+        instances = []
+        
+        def get_instance():
+            barrier.wait()
+            instances.append(mcp_interface.get_smart_router_mcp())
+        
+        threads = [threading.Thread(target=get_instance) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert len(slow_interface) == 1
+        assert all(instance is slow_interface[0] for instance in instances)
+    
+    def test_reset_creates_new_instance(self, slow_interface):
+        """测试重置后重新创建实例"""
+        first = mcp_interface.get_smart_router_mcp()
+        assert mcp_interface.get_smart_router_mcp() is first
+        
+        mcp_interface.reset_smart_router_mcp()
+        
+        assert mcp_interface.get_smart_router_mcp() is not first
+        assert len(slow_interface) == 2